@@ -4,20 +4,31 @@ import sys
 import os
 import webbrowser
 from PyQt5 import QtWidgets
-from PyQt6 import uic
-from PyQt6.QtCore import *
-from PyQt6.QtGui import *
+from PyQt5.QtCore import *
+from PyQt5.QtGui import *
 import numpy as np
 import pyqtgraph as pg
 import random
-import math
-import pandas as pd
 from conversion_functions import *
 from functions import *
+from data_loader import *
+from workers import Worker
+from lod import MinMaxPyramid, plot_lod
+from pipeline import Pipeline, Step
+from result_cache import result_cache, fingerprint
 from form import Ui_MainWindow as Ui_M
 from convertfile import Ui_MainWindow
 
 
+# Functions of the combo box that can be stacked as processing steps: (operation of the pipeline, names of the parameters)
+step_functions = {'Low pass filter': ('lowpass', ['fc']), 'High pass filter': ('highpass', ['fc']),
+                  'Differentiation': ('derivative', []), 'Integration': ('integration', []),
+                  'Windowed Phasor (Magnitude)': ('phasor_mag', ['sr', 'cycles', 'dom_freq']),
+                  'Windowed Phasor (Angle)': ('phasor_angle', ['sr', 'cycles', 'dom_freq']),
+                  'Trend filter': ('trend', ['lambda1']),
+                  'Moving window average': ('average', ['t_win']), 'Moving window RMS': ('rms', ['t_win'])}
+
+
 class MainWindow(QtWidgets.QMainWindow, Ui_M):
     def __init__(self):
         QtWidgets.QMainWindow.__init__(self)
@@ -88,17 +99,80 @@ class MainWindow(QtWidgets.QMainWindow, Ui_M):
         # Conversion button
         self.convert_button.clicked.connect(self.openwidget)
 
+        # Computations run on worker threads, results are plotted as they complete
+        self.threadpool = QThreadPool.globalInstance()
+        self.jobs = []
+        self.cancel_button = QtWidgets.QPushButton('Cancel')
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancelJobs)
+        self.statusbar.addPermanentWidget(self.cancel_button)
+
+        # Results of the functions are memoized, and kept on disk across restarts when ticked
+        self.disk_cache = QtWidgets.QCheckBox('Keep results on disk')
+        self.disk_cache.clicked.connect(self.setDiskCache)
+        self.statusbar.addPermanentWidget(self.disk_cache)
+
+        # Processing steps, the signal goes through the stack of steps before the selected function is applied.
+        # Results of the steps are kept, only the steps from the first changed one downward are recomputed.
+        self.pipeline = Pipeline()
+        self.steps_list = QtWidgets.QListWidget()
+        self.add_step = QtWidgets.QPushButton('Add step')
+        self.add_step.clicked.connect(self.addStep)
+        self.replace_step = QtWidgets.QPushButton('Replace step')
+        self.replace_step.clicked.connect(self.replaceStep)
+        self.remove_step = QtWidgets.QPushButton('Remove step')
+        self.remove_step.clicked.connect(self.removeStep)
+
+        steps_widget = QtWidgets.QWidget()
+        steps_layout = QtWidgets.QVBoxLayout(steps_widget)
+        steps_layout.addWidget(self.steps_list)
+        for button in (self.add_step, self.replace_step, self.remove_step):
+            steps_layout.addWidget(button)
+        self.steps_dock = QtWidgets.QDockWidget('Processing steps', self)
+        self.steps_dock.setWidget(steps_widget)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.steps_dock)
+
     # ---------------------------------------------------------------------------------------------------------------
 
     def plotter(self):
-        pen = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
         legend = self.plotwidget.addLegend(offset=(650, 2))
         # self.plotwidget.removeItem(legend)
         if not (self.keep_plot.isChecked()):
+            # Results of the jobs still running would be cleared anyway
+            self.cancelJobs()
             self.plotwidget.clear()
 
-        if not (self.fileinput.isChecked()):
-            if self.use_test.isChecked():
+        # Everything the computation needs is read from the widgets here, the worker never touches them. The steps are
+        # a snapshot too, the stack can be edited while the job is queued.
+        job = {'function': self.function_box.currentText(),
+               'fileinput': self.fileinput.isChecked(),
+               'use_test': self.use_test.isChecked(),
+               'time_signal': self.time_signal.text(),
+               'signal': self.signal.text(),
+               'file': self.file_1.text(),
+               'columns': [self.file_signal_1.currentText(), self.file_signal_2.currentText(),
+                           self.file_signal_3.currentText(), self.file_signal_4.currentText()],
+               'params': [self.param1.text(), self.param2.text(), self.param3.text()],
+               'steps': list(self.pipeline.steps),
+               'stack': repr(self.pipeline)}
+
+        worker = Worker(self.render, job)
+        worker.signals.progress.connect(self.showProgress)
+        worker.signals.result.connect(self.showResult)
+        worker.signals.error.connect(self.showError)
+        worker.signals.finished.connect(lambda: self.jobFinished(worker))
+        self.jobs.append(worker)
+        self.cancel_button.setEnabled(True)
+        self.threadpool.start(worker)
+
+    def compute(self, job, progress, check):
+        # Runs on a worker thread, returns the curves to plot as a list of (time, signal, name)
+        function = job['function']
+        param1, param2, param3 = job['params']
+        progress(0, f'Loading data for \'{function or "Plot"}\'')
+
+        if not job['fileinput']:
+            if job['use_test']:
                 name = 'Test signal'
                 t = np.arange(0, 1, 1e-5)
                 x = np.zeros(len(t))
@@ -111,115 +185,185 @@ class MainWindow(QtWidgets.QMainWindow, Ui_M):
                         x[i] = 8
             else:
                 name = 'Expression'
-                t = eval(self.time_signal.text())
-                x = eval(self.signal.text())
+                t = eval(job['time_signal'])
+                x = eval(job['signal'])
 
         else:
-            df = pd.read_csv(self.file_1.text(), index_col=False)
-            t = df[self.file_signal_1.currentText()]
-            x = df[self.file_signal_2.currentText()]
-
-            name = f'({self.file_signal_1.currentText()}, {self.file_signal_2.currentText()})'
-
-            if self.function_box.currentText()[4:] in ['Clarke\'s Transform', 'Clarke\'s Transform (Inverse)',
-                                                       'Sequence Transform',
-                                                       'Park\'s Transform', 'Park\'s Transform (Inverse)',
-                                                       'Instantaneous LL RMS voltage', 'Instantaneous line current']:
-                y = df[self.file_signal_3.currentText()]
-                z = df[self.file_signal_4.currentText()]
-
-        if self.function_box.currentText() == '':
-            self.plotwidget.plot(t, x, pen=pen, name=name)
-
-        elif self.function_box.currentText()[3:] == 'Low pass filter':
-            self.param1.setEnabled(True)
-            output = mylowpass(t, x, float(self.param1.text()))
-            self.plotwidget.plot(t, output, pen=pen, name=f'Low pass at Fc={self.param1.text()}')
-
-        elif self.function_box.currentText()[3:] == 'High pass filter':
-            self.param1.setEnabled(True)
-            output = myhighpass(t, x, float(self.param1.text()))
-            self.plotwidget.plot(t, output, pen=pen, name=f'High pass at Fc={self.param1.text()}')
-
-        elif self.function_box.currentText()[3:] == 'Differentiation':
-            output = derivative(t, x)
-            self.plotwidget.plot(t, output, pen=pen, name='Differentiation of signal')
+            columns = job['columns'][:2]
 
-        elif self.function_box.currentText()[3:] == 'Integration':
-            output = integration(t, x)
-            self.plotwidget.plot(t, output, pen=pen, name='Integration of signal')
+            name = f'({columns[0]}, {columns[1]})'
 
-        elif self.function_box.currentText()[3:] == 'Windowed Phasor (Magnitude)':
-            output, t_new = window_phasor_mag(t, x, int(self.param1.text()), float(self.param2.text()),
-                                              int(self.param3.text()))
-            self.plotwidget.plot(t_new, output, pen=pen, name=f'Window phasor at {self.param3.text()} (Magnitude)')
-
-        elif self.function_box.currentText()[3:] == 'Windowed Phasor (Angle)':
-            output, t_new = window_phasor_angle(t, x, int(self.param1.text()), float(self.param2.text()),
-                                                int(self.param3.text()))
-            self.plotwidget.plot(t_new, output, pen=pen, name=f'Window phasor at {self.param3.text()} (Angle)')
-
-        elif self.function_box.currentText()[3:] == 'Trend filter':
-            output, t_new = trendfilter(t, x, eval(self.param1.text()))
-            self.plotwidget.plot(t_new, output, pen=pen, name=f'Trend filter with lambda={self.param1.text()}')
-
-        elif self.function_box.currentText()[4:] == 'Clarke\'s Transform':
-            x1, y1, z1 = clarkestranform(t, x, y, z)
-            pen1 = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
-            pen2 = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
-            self.plotwidget.plot(t, x1, pen=pen, name='Alpha component')
-            self.plotwidget.plot(t, y1, pen=pen1, name='Beta component')
-            self.plotwidget.plot(t, z1, pen=pen2, name='Zero component')
-
-        elif self.function_box.currentText()[4:] == 'Clarke\'s Transform (Inverse)':
-            x1, y1, z1 = inv_clarkestransform(t, x, y, z)
-            pen1 = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
-            pen2 = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
-            self.plotwidget.plot(t, x1, pen=pen, name='a component')
-            self.plotwidget.plot(t, y1, pen=pen1, name='b component')
-            self.plotwidget.plot(t, z1, pen=pen2, name='c component')
-
-        elif self.function_box.currentText()[4:] == 'Sequence Transform':
-            x1, y1, z1 = sequencetransform(t, x, y, z)
-            pen1 = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
-            pen2 = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
-            self.plotwidget.plot(t, x1, pen=pen)
-            self.plotwidget.plot(t, y1, pen=pen1)
-            self.plotwidget.plot(t, z1, pen=pen2)
-
-        elif self.function_box.currentText()[4:] == 'Park\'s Transform':
-            x1, y1, z1 = parkstransform(t, x, y, z,
-                                        int(self.param2.text()), int(self.param1.text()))
-            pen1 = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
-            pen2 = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
-            self.plotwidget.plot(t, x1, pen=pen, name='D component')
-            self.plotwidget.plot(t, y1, pen=pen1, name='Q component')
-            self.plotwidget.plot(t, z1, pen=pen2, name='Zero component')
-
-        elif self.function_box.currentText()[4:] == 'Park\'s Transform (Inverse)':
-            x1, y1, z1 = inv_parkstransform(t, x, y, z,
-                                            int(self.param2.text()), int(self.param1.text()))
-            pen1 = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
-            pen2 = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
-            self.plotwidget.plot(t, x1, pen=pen, name='a component')
-            self.plotwidget.plot(t, y1, pen=pen1, name='b component')
-            self.plotwidget.plot(t, z1, pen=pen2, name='c component')
-
-        elif self.function_box.currentText()[3:] == 'Moving window average':
-            output = avgMovWin(t, x, int(self.param1.text()))
-            self.plotwidget.plot(t, output, pen=pen)
-
-        elif self.function_box.currentText()[3:] == 'Moving window RMS':
-            output = rmsMovWin(t, x, int(self.param1.text()))
-            self.plotwidget.plot(t, output, pen=pen)
-
-        elif self.function_box.currentText()[4:] == 'Instantaneous LL RMS voltage':
-            output = instaLL_RMSVoltage(t, x, y, z)
-            self.plotwidget.plot(t, output, pen=pen, name='Instantaneous LL RMS Voltage')
-
-        elif self.function_box.currentText()[4:] == 'Instantaneous line current':
-            output = insta_RMSCurrent(t, x, y, z)
-            self.plotwidget.plot(t, output, pen=pen, name='Instantaneous line current')
+            if function[4:] in ['Clarke\'s Transform', 'Clarke\'s Transform (Inverse)',
+                                'Sequence Transform',
+                                'Park\'s Transform', 'Park\'s Transform (Inverse)',
+                                'Instantaneous LL RMS voltage', 'Instantaneous line current']:
+                columns = job['columns']
+                t, x, y, z = load_columns(job['file'], columns)
+            else:
+                t, x = load_columns(job['file'], columns)
+
+        if job['steps']:
+            check()
+            progress(25, f'Running the processing steps \'{job["stack"]}\'')
+            if function[4:] in ['Clarke\'s Transform', 'Clarke\'s Transform (Inverse)',
+                                'Sequence Transform',
+                                'Park\'s Transform', 'Park\'s Transform (Inverse)',
+                                'Instantaneous LL RMS voltage', 'Instantaneous line current']:
+                # Every phase goes through the steps, without keeping their results
+                stack = Pipeline(job['steps'])
+                (_, x), (_, y), (t, z) = [stack.run(t, c, keep=False) for c in (x, y, z)]
+            else:
+                # The signal is identified by its content, hashed only once for the read-only columns of the files
+                key = (fingerprint(t), fingerprint(x))
+                t, x = self.pipeline.run(t, x, key=key, steps=job['steps'])
+
+        check()
+        progress(50, f'Computing \'{function or "Plot"}\'')
+
+        if function == '':
+            return [(t, x, name)]
+
+        elif function[3:] == 'Low pass filter':
+            output = result_cache(mylowpass, t, x, float(param1))
+            return [(t, output, f'Low pass at Fc={param1}')]
+
+        elif function[3:] == 'High pass filter':
+            output = result_cache(myhighpass, t, x, float(param1))
+            return [(t, output, f'High pass at Fc={param1}')]
+
+        elif function[3:] == 'Differentiation':
+            output = result_cache(derivative, t, x)
+            return [(t, output, 'Differentiation of signal')]
+
+        elif function[3:] == 'Integration':
+            output = result_cache(integration, t, x)
+            return [(t, output, 'Integration of signal')]
+
+        elif function[3:] == 'Windowed Phasor (Magnitude)':
+            output, _, t_new = result_cache(window_phasor, t, x, int(param1), float(param2), int(param3))
+            return [(t_new, output, f'Window phasor at {param3} (Magnitude)')]
+
+        elif function[3:] == 'Windowed Phasor (Angle)':
+            _, output, t_new = result_cache(window_phasor, t, x, int(param1), float(param2), int(param3))
+            return [(t_new, output, f'Window phasor at {param3} (Angle)')]
+
+        elif function[3:] == 'Trend filter':
+            output, t_new = result_cache(trendfilter, t, x, eval(param1))
+            return [(t_new, output, f'Trend filter with lambda={param1}')]
+
+        elif function[4:] == 'Clarke\'s Transform':
+            x1, y1, z1 = result_cache(clarkestranform, t, x, y, z)
+            return [(t, x1, 'Alpha component'), (t, y1, 'Beta component'), (t, z1, 'Zero component')]
+
+        elif function[4:] == 'Clarke\'s Transform (Inverse)':
+            x1, y1, z1 = result_cache(inv_clarkestransform, t, x, y, z)
+            return [(t, x1, 'a component'), (t, y1, 'b component'), (t, z1, 'c component')]
+
+        elif function[4:] == 'Sequence Transform':
+            x1, y1, z1 = result_cache(sequencetransform, t, x, y, z)
+            return [(t, x1, None), (t, y1, None), (t, z1, None)]
+
+        elif function[4:] == 'Park\'s Transform':
+            x1, y1, z1 = result_cache(parkstransform, t, x, y, z, int(param2), int(param1))
+            return [(t, x1, 'D component'), (t, y1, 'Q component'), (t, z1, 'Zero component')]
+
+        elif function[4:] == 'Park\'s Transform (Inverse)':
+            x1, y1, z1 = result_cache(inv_parkstransform, t, x, y, z, int(param2), int(param1))
+            return [(t, x1, 'a component'), (t, y1, 'b component'), (t, z1, 'c component')]
+
+        elif function[3:] == 'Moving window average':
+            output = result_cache(avgMovWin, t, x, float(param1))
+            return [(t, output, None)]
+
+        elif function[3:] == 'Moving window RMS':
+            output = result_cache(rmsMovWin, t, x, float(param1))
+            return [(t, output, None)]
+
+        elif function[4:] == 'Instantaneous LL RMS voltage':
+            output = result_cache(instaLL_RMSVoltage, t, x, y, z)
+            return [(t, output, 'Instantaneous LL RMS Voltage')]
+
+        elif function[4:] == 'Instantaneous line current':
+            output = result_cache(insta_RMSCurrent, t, x, y, z)
+            return [(t, output, 'Instantaneous line current')]
+
+        return []
+
+    def render(self, job, progress, check):
+        # Runs on a worker thread, computes the curves and their level of detail pyramids
+        curves = self.compute(job, progress, check)
+        if job['stack']:
+            curves = [(t, y, f'{job["stack"]} -> {name or job["function"][3:].strip() or "signal"}')
+                      for t, y, name in curves]
+        check()
+        progress(90, 'Preparing plot')
+        return [(MinMaxPyramid(t, y), name) for t, y, name in curves]
+
+    def showResult(self, curves):
+        for pyramid, name in curves:
+            pen = pg.mkPen(color=(random.randint(50, 255), random.randint(50, 255), random.randint(50, 255)), width=3)
+            plot_lod(self.plotwidget, pyramid, pen=pen, name=name)
+
+        stats = dataset_cache.stats()
+        results = result_cache.stats()
+        self.statusbar.showMessage(f'Data cache: {stats["hits"]} hits, {stats["misses"]} misses, '
+                                   f'{stats["nbytes"] / 1024 ** 2:.0f} MB in use | '
+                                   f'Result cache: {results["hits"] + results["disk_hits"]} hits, '
+                                   f'{results["misses"]} misses, {results["nbytes"] / 1024 ** 2:.0f} MB in use')
+
+    def setDiskCache(self):
+        if self.disk_cache.isChecked():
+            result_cache.directory = os.path.join(os.path.expanduser('~'), '.ppt', 'results')
+        else:
+            result_cache.directory = None
+
+    def showProgress(self, percent, message):
+        self.statusbar.showMessage(f'[{len(self.jobs)} running] {message} ({percent}%)')
+
+    def showError(self, message):
+        QtWidgets.QMessageBox.warning(self, 'Error', message)
+
+    def jobFinished(self, worker):
+        self.jobs.remove(worker)
+        self.cancel_button.setEnabled(bool(self.jobs))
+
+    def cancelJobs(self):
+        for worker in self.jobs:
+            worker.cancel()
+
+    def currentStep(self):
+        # Processing step of the selected function and parameters, None if the function cannot be stacked
+        function = step_functions.get(self.function_box.currentText()[3:])
+        if function is None:
+            QtWidgets.QMessageBox.warning(self, 'Error', 'Only the functions of a single signal can be added as steps')
+            return None
+
+        operation, names = function
+        values = [self.param1.text(), self.param2.text(), self.param3.text()]
+        try:
+            return Step(operation, **dict(zip(names, values)))
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, 'Error', f'Invalid parameters: {e}')
+            return None
+
+    def addStep(self):
+        step = self.currentStep()
+        if step is not None:
+            self.pipeline.steps.append(step)
+            self.steps_list.addItem(repr(step))
+
+    def replaceStep(self):
+        row = self.steps_list.currentRow()
+        step = self.currentStep() if row >= 0 else None
+        if step is not None:
+            self.pipeline.steps[row] = step
+            self.steps_list.item(row).setText(repr(step))
+
+    def removeStep(self):
+        row = self.steps_list.currentRow()
+        if row >= 0:
+            del self.pipeline.steps[row]
+            self.steps_list.takeItem(row)
 
     # ----------------------------------------------------------------------------------------
 
@@ -361,20 +505,21 @@ class MainWindow(QtWidgets.QMainWindow, Ui_M):
         self.file_signal_2.clear()
         dlg = QtWidgets.QFileDialog(self)
         dlg.setFileMode
+        # Recordings are opened directly, without converting them first
+        dlg.setNameFilters(['Data files (*.csv *.parquet *.feather *.npz *.mmap *.cfg *.dat *.mat *.inf *.out)',
+                            'All files (*)'])
         filenames = QStringListModel()
 
         if dlg.exec():
             filenames = dlg.selectedFiles()
             self.file_1.setText(filenames[0])
 
-        df = pd.read_csv(self.file_1.text())
-
         self.file_signal_1.clear()
         self.file_signal_2.clear()
         self.file_signal_3.clear()
         self.file_signal_4.clear()
 
-        df_columns = [''] + list(df.columns)
+        df_columns = [''] + read_header(self.file_1.text())
 
         self.file_signal_1.addItems(df_columns)
         self.file_signal_2.addItems(df_columns)
@@ -411,6 +556,7 @@ class convertFiles(QtWidgets.QMainWindow, Ui_MainWindow):
     def __init__(self):
         QtWidgets.QMainWindow.__init__(self)
         self.dir_path = None
+        self.worker = None
         self.setupUi(self)
 
         self.setWindowTitle('Convert files')
@@ -418,6 +564,16 @@ class convertFiles(QtWidgets.QMainWindow, Ui_MainWindow):
         self.browse_folder.clicked.connect(self.getfolder)
         self.convert_files.clicked.connect(self.convert_Files)
 
+        # Output format of the converted files, the main window reads all of them
+        self.format_box = QtWidgets.QComboBox()
+        self.format_box.addItems(list(output_formats))
+        self.statusbar.addPermanentWidget(QtWidgets.QLabel('Output format:'))
+        self.statusbar.addPermanentWidget(self.format_box)
+
+        # Unchanged files are skipped, unless they are all converted again
+        self.force_box = QtWidgets.QCheckBox('Convert all again')
+        self.statusbar.addPermanentWidget(self.force_box)
+
     def getfolder(self):
         dlg = QtWidgets.QFileDialog(self)
         self.dir_path = dlg.getExistingDirectory(self, 'Choose directory', 'C:\\')
@@ -426,21 +582,44 @@ class convertFiles(QtWidgets.QMainWindow, Ui_MainWindow):
     def convert_Files(self):
         path = self.folder_location.text()
 
-        com_files, mat_files, inf_files, out_files = files2convert(path)
+        # Conversions are spread over a process pool, driven from a worker thread so the window stays responsive
+        self.convert_files.setEnabled(False)
+        self.worker = Worker(self.runConversion, path, self.format_box.currentText(), self.force_box.isChecked())
+        self.worker.signals.progress.connect(self.showProgress)
+        self.worker.signals.result.connect(self.showSummary)
+        self.worker.signals.error.connect(self.showError)
+        self.worker.signals.finished.connect(lambda: self.convert_files.setEnabled(True))
+        QThreadPool.globalInstance().start(self.worker)
+
+    def runConversion(self, path, fmt, force, progress, check):
+        def callback(done, total, name, error):
+            if error is None:
+                progress(int(100 * done / total), f'[{done}/{total}] \'{name}\' successfully converted')
+            else:
+                progress(int(100 * done / total), f'[{done}/{total}] \'{name}\' failed, {error}')
+
+        progress(0, 'Converting files...')
+        return convert_folder(path, callback=callback, fmt=fmt, force=force)
 
-        for i in range(len(com_files)):
-            cfg_file = com_files[i]
-            dat_file = com_files[i][:-4] + '.dat'
-            comtrade2csv(cfg_file, dat_file, path)
+    def showProgress(self, percent, message):
+        self.statusbar.showMessage(message)
 
-        for i in mat_files:
-            mat2csv(i, path)
+    def showSummary(self, summary):
+        message = (f'{summary["files"]} files processed in {summary["seconds"]:.1f} s '
+                   f'({summary["files_per_s"]:.2f} files/s, {summary["mb_per_s"]:.1f} MB/s), '
+                   f'{summary["skipped"]} unchanged files skipped')
+        print(message)
+        self.statusbar.showMessage(message)
 
-        for i in inf_files:
-            pscad2csv(i, out_files, path)
+        if summary['failed']:
+            failures = '\n'.join(f'{name}: {error}' for name, error in summary['failed'])
+            QtWidgets.QMessageBox.warning(self, 'Complete', f'{message}\n\n{len(summary["failed"])} files failed:\n{failures}')
+        else:
+            print('All files converted!')
+            QtWidgets.QMessageBox.information(self, 'Complete', f'All files converted!\n{message}')
 
-        print('All files converted!')
-        QtWidgets.QMessageBox.information(self, 'Complete', 'All files converted!')
+    def showError(self, message):
+        QtWidgets.QMessageBox.warning(self, 'Error', message)
 
 # ------------------------------------------------------------------------------------------------------
 
@@ -0,0 +1,91 @@
+import argparse
+import os
+import sys
+import pandas as pd
+from data_loader import load_columns
+from pipeline import Pipeline, Step, operations
+from conversion_functions import conversion_jobs, convert_folder, output_format, output_formats, write_frame
+
+"""
+Command line version of the application, without any GUI so it runs on servers with no display.
+
+Converts the recordings of a folder, then applies a chain of operations to selected channels
+of every recording and writes the results to 'Processed_files'. For example:
+
+    python PPT_cli.py D:/records --channels Va Vb --op lowpass:fc=200 --op phasor_mag:sr=1,cycles=1 --op rms:t_win=0.02
+"""
+
+
+def parse_step(text):
+    # Argument type of '--op', a pipeline step given as 'operation:key=value,key=value'
+    try:
+        return Step.parse(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def process_file(source, time_channel, channels, pipeline, output, fmt):
+    # Loads the selected channels of a recording, runs the pipeline on every one of them and writes the results
+    # to 'output', with the time of the results as first column
+    columns = load_columns(source, [time_channel] + channels)
+    t = columns[0]
+
+    results = {time_channel: t}
+    for name, x in zip(channels, columns[1:]):
+        # Every channel goes through the same steps, so they all end up with the same time
+        results[time_channel], results[name] = pipeline.run(t, x, keep=False)
+
+    df = pd.DataFrame(results, copy=False)
+    return write_frame(df, output, fmt)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Converts the recordings of a folder and processes selected channels.',
+                                     epilog='Operations: ' + ', '.join(f'{name}({", ".join(types)})'
+                                                                      for name, (_, types) in operations.items()))
+    parser.add_argument('folder', help='Folder of the COMTRADE, MATLAB and PSCAD recordings')
+    parser.add_argument('--format', default='csv', choices=list(output_formats),
+                        help='Format of the converted and processed files (default: csv)')
+    parser.add_argument('--no-convert', action='store_true', help='Only process, without converting the folder')
+    parser.add_argument('--force', action='store_true', help='Convert again the files that did not change')
+    parser.add_argument('--workers', type=int, default=None, help='Number of conversion processes (default: CPUs)')
+    parser.add_argument('--channels', nargs='+', default=[], help='Channels to process')
+    parser.add_argument('--time', default='Time', help='Name of the time channel (default: Time)')
+    parser.add_argument('--op', dest='chain', action='append', type=parse_step, default=[],
+                        help='Operation to apply, as name:key=value,..., applied in the order given')
+    parser.add_argument('--output', default=None, help='Folder of the processed files (default: <folder>/Processed_files)')
+    args = parser.parse_args(argv)
+
+    failed = 0
+    if not args.no_convert:
+        def callback(done, total, name, error):
+            if error is not None:
+                print(f'[{done}/{total}] \'{name}\' failed, {error}')
+
+        summary = convert_folder(args.folder, max_workers=args.workers, callback=callback, fmt=args.format,
+                                 force=args.force)
+        failed += len(summary['failed'])
+        print(f'{summary["files"]} files converted in {summary["seconds"]:.1f} s, '
+              f'{summary["skipped"]} unchanged files skipped, {len(summary["failed"])} failed')
+
+    if args.channels:
+        fmt = output_format(args.format)
+        output = args.output or os.path.join(args.folder, 'Processed_files')
+        os.makedirs(output, exist_ok=True)
+
+        pipeline = Pipeline(args.chain)
+        for name, *_ in conversion_jobs(args.folder, args.format):
+            path = os.path.join(output, os.path.splitext(name)[0] + output_formats[fmt])
+            try:
+                process_file(os.path.join(args.folder, name), args.time, args.channels, pipeline, path, fmt)
+            except Exception as e:
+                failed += 1
+                print(f'\'{name}\' failed, {type(e).__name__}: {e}')
+            else:
+                print(f'\'{name}\' successfully processed')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,31 @@
 import pandas as pd
-from scipy.io import loadmat
-from comtrade import Comtrade
 import os
+import time
+import zipfile
+import json
+import hashlib
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from data_loader import write_mmap, create_mmap, truncate_mmap, unique_names
+
+# The readers of the different file types (comtrade, scipy.io, h5py) and pyarrow are imported by the functions using
+# them, on first use, so they are not loaded at the start of the application
+
+# Output formats of the converters, with the suffix of the converted files
+output_formats = {'csv': '_csv.csv', 'parquet': '.parquet', 'feather': '.feather', 'npz': '.npz', 'mmap': '.mmap'}
+
+# Version of the converters, recorded in the manifest of 'Converted_files'. To be increased whenever the content of the
+# converted files changes, the files converted by an earlier version are then converted again.
+CONVERTER_VERSION = 1
+MANIFEST = 'manifest.json'
 
 
 # Finding all the different type of files that needs to be converted
 def files2convert(path):
 
-    if not os.path.exists(path+"/Converted_files/"):
-        os.makedirs(path+'/Converted_files/')
+    if not os.path.exists(os.path.join(path, 'Converted_files')):
+        os.makedirs(os.path.join(path, 'Converted_files'))
 
     com_files = []
     mat_files = []
@@ -28,46 +45,306 @@ def files2convert(path):
     return com_files, mat_files, inf_files, out_files
 
 
-# Function to convert comtrade file to csv
-def comtrade2csv(cfg_file, dat_file, folder_path):
-    rec = Comtrade()  # Making an instance of Comtrade class
-    rec.load(folder_path + '\\' + cfg_file, folder_path + '\\' + dat_file)  # Loading the data
+def output_format(fmt):
+    # Parquet and Feather are written with pyarrow, NPZ is used instead when it is not installed
+    if fmt not in output_formats:
+        raise ValueError(f'Unknown output format \'{fmt}\', expected one of {list(output_formats)}')
+    if fmt in ('parquet', 'feather'):
+        try:
+            import pyarrow
+        except ImportError:
+            return 'npz'
+    return fmt
+
+
+def output_path(folder_path, file, fmt='csv'):
+    # Path of the converted version of 'file', inside the 'Converted_files' folder of 'folder_path'
+    return os.path.join(folder_path, 'Converted_files', os.path.splitext(file)[0] + output_formats[fmt])
+
+
+def save_converted(df, folder_path, file, fmt='csv'):
+    # Writes the converted data of 'file' in the requested format, returns the path of the written file
+
+    fmt = output_format(fmt)
+    return write_frame(df, output_path(folder_path, file, fmt), fmt)
+
+
+def write_frame(df, path, fmt='csv'):
+    # Writes the columns of a DataFrame to 'path' in the format 'fmt' (a key of 'output_formats'), returns 'path'
+
+    if fmt != 'csv' and df.columns.has_duplicates:
+        # The other formats look the channels up by name, the repeated names are numbered
+        df = df.set_axis(unique_names(df.columns), axis=1)
+
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+    elif fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    elif fmt == 'feather':
+        df.reset_index(drop=True).to_feather(path)
+    elif fmt == 'mmap':
+        write_mmap(df, path)
+    else:
+        # One '.npy' member per column, the same layout as numpy.savez without its restrictions on names
+        with zipfile.ZipFile(path, 'w', allowZip64=True) as archive:
+            for i, column in enumerate(df.columns):
+                with archive.open(f'{column}.npy', 'w', force_zip64=True) as member:
+                    np.lib.format.write_array(member, np.ascontiguousarray(df.iloc[:, i].to_numpy()))
+    return path
+
+
+def _frame(names, arrays):
+    # Helper function, DataFrame of the columns 'arrays' taken by position, channels sharing a name stay separate
+    df = pd.DataFrame(dict(enumerate(arrays)), copy=False)
+    df.columns = list(names)
+    return df
+
+
+class ConvertedWriter:
+    # Writes the converted data of 'file' chunk by chunk, so only one chunk has to be held in memory
+    # (NPZ needs every column complete before writing, it is gathered in memory and written on 'close').
+    # The columns of the chunks are taken by position, they must be in the order of 'names'.
+
+    def __init__(self, folder_path, file, fmt, names, dtypes, length):
+        self.folder_path = folder_path
+        self.file = file
+        self.fmt = output_format(fmt)
+        self.path = output_path(folder_path, file, self.fmt)
+        self.names = list(names)
+        self.length = length
+        self.row = 0
+        self._writer = None
+        self._arrays = None
+
+        if self.fmt == 'csv':
+            self._writer = open(self.path, 'w', newline='')
+            pd.DataFrame(columns=self.names).to_csv(self._writer, index=False)
+        elif self.fmt == 'mmap':
+            self._arrays = create_mmap(self.path, self.names, dtypes, length)
+        elif self.fmt == 'npz':
+            self._arrays = [np.empty(length, dtype=d) for d in dtypes]
+
+    def write(self, df):
+        if self.fmt == 'csv':
+            df.to_csv(self._writer, header=False, index=False)
+        elif self.fmt in ('parquet', 'feather'):
+            import pyarrow
+            table = pyarrow.Table.from_pandas(df.set_axis(unique_names(self.names), axis=1), preserve_index=False)
+            if self._writer is None:
+                if self.fmt == 'parquet':
+                    import pyarrow.parquet
+                    self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+                else:
+                    import pyarrow.ipc
+                    self._writer = pyarrow.ipc.new_file(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            for i, target in enumerate(self._arrays):
+                target[self.row:self.row + len(df)] = df.iloc[:, i].to_numpy()
+        self.row += len(df)
+
+    def close(self):
+        if self.fmt in ('parquet', 'feather') and self._writer is None:
+            # Nothing was written, an empty table still records the columns
+            save_converted(pd.DataFrame(columns=self.names), self.folder_path, self.file, self.fmt)
+        elif self.fmt == 'mmap':
+            for target in self._arrays:
+                if isinstance(target, np.memmap):
+                    target.flush()
+            self._arrays = None
+            # The data file can hold fewer samples than announced (truncated records), the rest is not kept
+            if self.row < self.length:
+                truncate_mmap(self.path, self.row)
+        elif self.fmt == 'npz':
+            df = _frame(self.names, [a[:self.row] for a in self._arrays])
+            save_converted(df, self.folder_path, self.file, self.fmt)
+
+        if self._writer is not None:
+            self._writer.close()
 
-    df_analog = pd.DataFrame(rec.analog, index=rec.analog_channel_ids).transpose()  # Creating dataframe for analog data
-    df_digital = pd.DataFrame(rec.status, index=rec.status_channel_ids).transpose()  # Creating dataframe for digital data
 
-    combined_df = pd.concat([df_analog, df_digital], axis=1)  # Combining the 2 dataframes into 1
-    os.chdir(folder_path+'/Converted_files/')
-    combined_df.to_csv(cfg_file[:-4]+'_csv.csv', index=False)  # Converting the dataframe into csv
-    os.chdir(folder_path)
+# Function to convert comtrade file to csv
+def comtrade_chunks(cfg, dat_path, chunk_size=100000, time=False):
+    # Reads a COMTRADE '*.dat' file 'chunk_size' samples at a time, scaling the analog channels with the
+    # 'a * x + b' factors of the configuration 'cfg' (comtrade.Cfg). Yields one DataFrame per chunk, with the
+    # analog channels followed by the status channels, missing analog samples being NaN.
+    # With 'time', the chunks start with a 'Time' column in seconds.
+
+    ft = cfg.ft.upper()
+    analog_count = cfg.analog_count
+    status_count = cfg.status_count
+    total = cfg.sample_rates[-1][1]
+    names = [ch.name for ch in cfg.analog_channels] + [ch.name for ch in cfg.status_channels]
+    a = np.array([ch.a for ch in cfg.analog_channels], dtype=float)
+    b = np.array([ch.b for ch in cfg.analog_channels], dtype=float)
+
+    if ft == 'ASCII':
+        missing = None if cfg.rev_year == '1991' else 99999
+        reader = pd.read_csv(dat_path, header=None, chunksize=chunk_size, nrows=total)
+        for chunk in reader:
+            values = chunk.to_numpy()
+            analog = values[:, 2:2 + analog_count].astype(float)
+            status = values[:, values.shape[1] - status_count:].astype(np.int32)
+            if missing is not None:
+                analog[analog == missing] = np.nan
+            analog *= a
+            analog += b
+            t = _comtrade_time(cfg, values[:, 0], values[:, 1].astype(float)) if time else None
+            yield _comtrade_frame(names, analog, status, t)
+        return
+
+    analog_type = {'BINARY': '<i2', 'BINARY32': '<i4', 'FLOAT32': '<f4'}[ft]
+    # FLOAT32 has no missing value the samples can be equal to, the library's sentinel is not a float32 value
+    missing = {'BINARY': -1 if cfg.rev_year == '1991' else -32768,
+               'BINARY32': -2147483648, 'FLOAT32': None}[ft]
+    groups = -(-status_count // 16)
+    record = np.dtype([('n', '<u4'), ('timestamp', '<u4'),
+                       ('analog', analog_type, (analog_count,)), ('status', '<u2', (groups,))])
+
+    bits = np.arange(status_count)
+    with open(dat_path, 'rb') as f:
+        remaining = total
+        while remaining > 0:
+            rows = np.fromfile(f, dtype=record, count=min(chunk_size, remaining))
+            if len(rows) == 0:
+                break
+            remaining -= len(rows)
+
+            raw = rows['analog']
+            analog = raw.astype(float)
+            if missing is not None:
+                analog[raw == missing] = np.nan
+            analog *= a
+            analog += b
+            status = ((rows['status'][:, bits // 16] >> (bits % 16)) & 1).astype(np.int32)
+            t = _comtrade_time(cfg, rows['n'], rows['timestamp'].astype(float)) if time else None
+            yield _comtrade_frame(names, analog, status, t)
+
+
+def _comtrade_time(cfg, n, timestamp):
+    # Helper function for 'comtrade_chunks', time of the samples numbered 'n' (1-based). Same rule as the comtrade
+    # library: '(n - 1) / rate' with the sampling rate of the segment holding the sample, or the timestamps of the
+    # '*.dat' file when the configuration has no sampling rate. Missing timestamps (0xFFFFFFFF) fall back on the rate.
+    ends = np.array([end for _, end in cfg.sample_rates])
+    rates = np.array([rate for rate, _ in cfg.sample_rates], dtype=float)
+    segment = np.minimum(np.searchsorted(ends, n), len(rates) - 1)
+    if not cfg.timestamp_critical:
+        return (n - 1) / rates[segment]
+
+    time = timestamp * cfg.time_base * cfg.timemult
+    absent = timestamp == 0xFFFFFFFF
+    if np.any(absent):
+        if np.any(rates[segment][absent] == 0):
+            raise ValueError('Missing timestamp and no sample rate provided')
+        time[absent] = (n[absent] - 1) / rates[segment][absent]
+    return time
+
+
+def _comtrade_frame(names, analog, status, time=None):
+    # Helper function for 'comtrade_chunks', DataFrame of one chunk of samples, the channel names may repeat
+    if time is None:
+        return _frame(names, list(analog.T) + list(status.T))
+    return _frame(['Time'] + names, [time] + list(analog.T) + list(status.T))
+
+
+def comtrade2csv(cfg_file, dat_file, folder_path, fmt='csv', chunk_size=100000):
+    from comtrade import Cfg
+
+    cfg = Cfg()  # Making an instance of the configuration (CFG) class
+    cfg.load(os.path.join(folder_path, cfg_file))  # Loading the channel names and scaling factors
+
+    # The samples are streamed from the '*.dat' file, 'chunk_size' at a time, straight into the output file
+    names = [ch.name for ch in cfg.analog_channels] + [ch.name for ch in cfg.status_channels]
+    dtypes = [np.float64] * cfg.analog_count + [np.int32] * cfg.status_count
+    writer = ConvertedWriter(folder_path, cfg_file, fmt, names, dtypes, cfg.sample_rates[-1][1])
+    try:
+        for chunk in comtrade_chunks(cfg, os.path.join(folder_path, dat_file), chunk_size):
+            writer.write(chunk)
+    finally:
+        writer.close()
 
     print('{} successfully converted'.format(cfg_file))
     return None
 
 
 # Function to convert matlab files to csv:
-def mat2csv(file, folder_path):
+def _is_v73(file_path):
+    # Helper function, MATLAB v7.3 files are HDF5 files and are read with h5py
+    with open(file_path, 'rb') as f:
+        return b'MATLAB 7.3' in f.read(128)
+
+
+def _h5py():
+    # Helper function, h5py module, with a clear message when it is missing
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError('install h5py to read MATLAB v7.3 files') from None
+    return h5py
+
+
+def mat_columns(file_path):
+    # Lists the variables of a '*.mat' file that hold a column of more than one sample, from the file headers only.
+    # Returns a dictionary of {name: number of samples}.
+
+    columns = {}
+    if _is_v73(file_path):
+        h5py = _h5py()
+        with h5py.File(file_path, 'r') as f:
+            for name, obj in f.items():
+                # HDF5 stores the transpose of the MATLAB array, a N x 1 column is a 1 x N dataset
+                if not isinstance(obj, h5py.Dataset) or name.startswith('#') or obj.attrs.get('MATLAB_class') == b'char':
+                    continue
+                shape = obj.shape[::-1]
+                if len(shape) == 2 and shape[0] > 1 and shape[1] == 1:
+                    columns[name] = shape[0]
+    else:
+        from scipy.io import whosmat
+        for name, shape, _ in whosmat(file_path):
+            if len(shape) == 2 and shape[0] > 1 and shape[1] == 1:
+                columns[name] = shape[0]
+    return columns
+
+
+def read_mat_columns(file_path, names=None):
+    # Reads the variables of a '*.mat' file that hold a column of more than one sample, as a dictionary of 1-D arrays.
+    # Variables are listed from the file headers first, only the qualifying ones (or 'names') are then read.
+
+    if names is None:
+        names = list(mat_columns(file_path))
+
+    columns = {}
+    if _is_v73(file_path):
+        h5py = _h5py()
+        with h5py.File(file_path, 'r') as f:
+            for name in names:
+                columns[name] = f[name][()].ravel()
+    elif names:
+        from scipy.io import loadmat
+        x = loadmat(file_path, variable_names=names)
+        for name in names:
+            columns[name] = x.pop(name).ravel()
+    return columns
+
+
+def mat2csv(file, folder_path, fmt='csv'):
     # Function to convert to '*.mat' files to '*.csv' file.
 
-    # Changing the working directory to 'Output' folder
-    os.chdir(folder_path + '/Converted_files/')
+    file_path = os.path.join(folder_path, file)
+    columns = read_mat_columns(file_path)
 
-    file_path = folder_path + '\\' + file
+    if columns:
+        # The variables are copied into one preallocated block, wrapped as it is by the DataFrame. Shorter
+        # variables are padded with NaN, the same way aligning them on the sample index did.
+        names = list(columns)
+        block = np.full((max(len(a) for a in columns.values()), len(names)), np.nan)
+        for i, name in enumerate(names):
+            a = columns.pop(name)
+            block[:len(a), i] = a
 
-    p = []
-    x = loadmat(file_path)
-    for i in list(x.keys())[3:]:
-        if len(x[i]) > 1:
-            p.append(i)
-
-    df = pd.DataFrame()
-
-    for i in p:
-        df = pd.concat([df, pd.DataFrame(x[i], columns=[i])], axis=1)
-        df.to_csv(file[:-4] + '_csv.csv', index=False)
+        save_converted(pd.DataFrame(block, columns=names, copy=False), folder_path, file, fmt)
 
     print(f'\'{file}\' successfully converted')
-    os.chdir(folder_path)
 
     return None
 
@@ -91,45 +368,211 @@ def get_columns(inf_file):
     return field_names
 
 
-def pscad2csv(inf_files, out_files, folder_path):
-    # Function to convert '*.inf', '*.out' files to '*.csv' file.
+def pscad_data_files(inf_file, out_files):
+    # Helper function, the '*_NN.out' data files of the PSCAD project 'inf_file', in order
+    return sorted(f for f in out_files if f[:-7] == inf_file[:-4])
+
+
+def pscad_channels(inf_file, out_files, folder_path):
+    # Maps the channels of a PSCAD project on its data files, from the first line of each file only.
+    # Returns a list of (data file, names of its channels), the time being the first column of every file.
 
-    column_names = get_columns(inf_files)
-    col = column_names.copy()
+    column_names = get_columns(os.path.join(folder_path, inf_file))
+    channels = []
+    col = 1
+    for files in pscad_data_files(inf_file, out_files):
+        with open(os.path.join(folder_path, files)) as file1:
+            count = len(file1.readline().split()) - 1
+        channels.append((files, column_names[col:col + count]))
+        col += count
+    return channels
 
-    data_files = []
-    for files in out_files:
-        if files[:-7] == inf_files[:-4]:
-            data_files.append(files)
 
-    count = 0
-    x = len(column_names) % 11
-    df = pd.DataFrame()
+def read_out_file(out_file):
+    # Helper function for 'read_pscad', parses the whitespace separated numbers of a '*.out' file
+    # into a (samples x columns) array, the first column being the time.
+
+    with open(out_file) as file1:
+        first = file1.readline()
+        text = file1.read()
+    ncols = len(first.split())
+
+    values = np.fromstring(first + text, sep=' ')
+    if ncols == 0 or len(values) % ncols:
+        raise ValueError(f'\'{out_file}\' is not a complete table of {ncols} columns')
+    return values.reshape(-1, ncols)
+
+
+def read_pscad(inf_file, out_files, folder_path):
+    # Reads a PSCAD project ('*.inf' and its '*_NN.out' data files) into one DataFrame.
+    # The time column is taken once from the first data file, the channels of every data file are
+    # copied into a single preallocated block in the order of the '*.inf' file.
+
+    column_names = get_columns(os.path.join(folder_path, inf_file))
+    data_files = pscad_data_files(inf_file, out_files)
+
+    block = None
+    col = 1
     for files in data_files:
-        if count < x:
-            df1 = pd.read_fwf(files, header=None)
-            y = dict(zip(df.columns, col[0:11]))
-            del col[1:11]
-            df1.rename(columns=y, inplace=True)
-            df = pd.concat([df, df1], axis=1)
-            count += 1
-        else:
-            df1 = pd.read_fwf(files, header=None)
-            y = dict(zip(df.columns, column_names[0:]))
-            df1.rename(columns=y, inplace=True)
-            df = pd.concat([df, df1], axis=1)
-            count += 1
+        data = read_out_file(os.path.join(folder_path, files))
+        if block is None:
+            block = np.empty((len(data), len(column_names)))
+            block[:, 0] = data[:, 0]
+        elif len(data) != len(block):
+            raise ValueError(f'\'{files}\' has {len(data)} samples, expected {len(block)}')
+
+        channels = min(data.shape[1] - 1, len(column_names) - col)
+        block[:, col:col + channels] = data[:, 1:1 + channels]
+        col += channels
         print('\'{}\' successfully converted'.format(files))
 
-    y = dict(zip(df.columns, column_names[0:11]))
-    df.rename(columns=y, inplace=True)
+    if block is None:
+        block = np.empty((0, len(column_names)))
+    return pd.DataFrame(block[:, :col], columns=column_names[:col], copy=False)
+
 
-    # Remove duplicate columns pandas DataFrame
-    df2 = df.loc[:, ~df.columns.duplicated()]
+def pscad2csv(inf_files, out_files, folder_path, fmt='csv'):
+    # Function to convert '*.inf', '*.out' files to '*.csv' file.
 
-    os.chdir(folder_path + '/Converted_files/')
-    df2.to_csv(inf_files[:-4] + '_csv.csv', index=False)
-    os.chdir(folder_path)
+    df = read_pscad(inf_files, out_files, folder_path)
+    save_converted(df, folder_path, inf_files, fmt)
 
     print(f'All files converted for \'{inf_files}\', COMPLETE')
     return None
+
+
+# Manifest of the converted files, used to skip the sources that did not change since their last conversion
+def file_hash(file_path, block=1024 ** 2):
+    # SHA-256 of the content of a file, read 'block' bytes at a time
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(block), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_state(file_path, previous=None):
+    # Size, modification time and hash of a source file. The hash is only computed when the size or the
+    # modification time differ from 'previous', the state recorded at the last conversion.
+    stat = os.stat(file_path)
+    state = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if previous is not None and all(previous.get(k) == v for k, v in state.items()):
+        state['sha256'] = previous['sha256']
+    else:
+        state['sha256'] = file_hash(file_path)
+    return state
+
+
+def read_manifest(path):
+    # Manifest of the 'Converted_files' folder of 'path', {converted file: {'version', 'sources': {file: state}}}
+    try:
+        with open(os.path.join(path, 'Converted_files', MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(path, manifest):
+    # Written to a temporary file first, an interrupted write never leaves a truncated manifest
+    manifest_path = os.path.join(path, 'Converted_files', MANIFEST)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+
+def up_to_date(path, entry, sources, output):
+    # True if 'output' exists and was converted by this version of the converters from the current content of
+    # 'sources'. The states recorded in 'entry' are refreshed for the sources that were only touched.
+    if entry is None or entry.get('version') != CONVERTER_VERSION or not os.path.exists(output):
+        return False
+    if sorted(entry['sources']) != sorted(sources):
+        return False
+
+    states = {}
+    for file in sources:
+        previous = entry['sources'][file]
+        states[file] = source_state(os.path.join(path, file), previous)
+        if states[file]['sha256'] != previous['sha256']:
+            return False
+    entry['sources'] = states
+    return True
+
+
+def _convert(function, args, path, sources):
+    # Runs one conversion in a worker process, returns the states of its sources as they were converted
+    states = {file: source_state(os.path.join(path, file)) for file in sources}
+    function(*args)
+    return states
+
+
+# Batch conversion of a folder, spread over a pool of processes
+def conversion_jobs(path, fmt='csv'):
+    # Returns the conversions to run for the folder as a list of (name, function, arguments, source files)
+
+    com_files, mat_files, inf_files, out_files = files2convert(path)
+
+    jobs = []
+    for cfg_file in com_files:
+        dat_file = cfg_file[:-4] + '.dat'
+        sources = [f for f in (cfg_file, dat_file) if os.path.exists(os.path.join(path, f))]
+        jobs.append((cfg_file, comtrade2csv, (cfg_file, dat_file, path, fmt), sources))
+
+    for file in mat_files:
+        jobs.append((file, mat2csv, (file, path, fmt), [file]))
+
+    for inf_file in inf_files:
+        sources = [inf_file] + pscad_data_files(inf_file, out_files)
+        jobs.append((inf_file, pscad2csv, (inf_file, out_files, path, fmt), sources))
+
+    return jobs
+
+
+def convert_folder(path, max_workers=None, callback=None, fmt='csv', force=False):
+    # Converts every file of the folder in parallel, 'max_workers' processes at most (number of CPUs by default),
+    # to the output format 'fmt'. Files converted earlier from the same sources, by the same version of the
+    # converters, are skipped unless 'force' is set.
+    # 'callback(done, total, name, error)' is called as each file completes, 'error' being None on success.
+    # Returns a summary of the batch as a dictionary.
+
+    start = time.perf_counter()
+    jobs = conversion_jobs(path, fmt)
+    manifest = read_manifest(path)
+
+    pending = []
+    for name, function, args, sources in jobs:
+        output = output_path(path, name, output_format(fmt))
+        key = os.path.basename(output)
+        if force or not up_to_date(path, manifest.get(key), sources, output):
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in sources)
+            pending.append((name, key, function, args, sources, size))
+
+    failed = []
+    converted_bytes = 0
+
+    try:
+        if pending:
+            workers = min(max_workers or os.cpu_count() or 1, len(pending))
+            # Spawned workers, forking the GUI process (Qt, threads holding locks) can hang or crash the workers
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = {pool.submit(_convert, function, args, path, sources): (name, key, size)
+                           for name, key, function, args, sources, size in pending}
+                for done, future in enumerate(as_completed(futures), 1):
+                    name, key, size = futures[future]
+                    error = future.exception()
+                    if error is None:
+                        converted_bytes += size
+                        manifest[key] = {'version': CONVERTER_VERSION, 'sources': future.result()}
+                    else:
+                        error = f'{type(error).__name__}: {error}'
+                        failed.append((name, error))
+                        manifest.pop(key, None)
+                    if callback is not None:
+                        callback(done, len(pending), name, error)
+    finally:
+        # Saved even if the batch is interrupted, the completed conversions are not redone
+        write_manifest(path, manifest)
+
+    seconds = time.perf_counter() - start
+    return {'files': len(pending), 'skipped': len(jobs) - len(pending), 'failed': failed, 'seconds': seconds,
+            'files_per_s': len(pending) / seconds if seconds else 0.0,
+            'mb_per_s': converted_bytes / 1024 ** 2 / seconds if seconds else 0.0}
@@ -0,0 +1,384 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+from memory_cache import MemoryCache
+
+"""
+Loading of the data files into the application, converted files as well as COMTRADE, MATLAB
+and PSCAD recordings opened directly. Only the columns that are actually plotted are parsed.
+"""
+
+
+class DatasetCache(MemoryCache):
+    """
+    In-process cache of parsed columns, shared by every plot of the application.
+
+    Entries are keyed on (file path, column, dtype) and evicted least recently used first
+    once the memory budget is exceeded. All entries of a file are dropped as soon as its
+    modification time or size changes. Shared by the worker threads, every access holds a lock.
+    """
+
+    def __init__(self, max_bytes=2 * 1024 ** 3):
+        super().__init__(max_bytes)
+        self._versions = {}
+
+    def validate(self, file, sources=None):
+        """
+        Drops the cached columns of 'file' if it changed on disk since they were loaded.
+
+        :param file: Absolute path of the data file
+        :param sources: Paths of the files the data of 'file' is read from, 'file' alone by default
+        """
+        version = tuple((stat.st_mtime_ns, stat.st_size) for stat in map(os.stat, sources or [file]))
+        with self._lock:
+            if self._versions.get(file, version) != version:
+                for key in [k for k in self._entries if k[0] == file]:
+                    self._remove(key)
+            self._versions[file] = version
+
+    def get(self, file, column, dtype):
+        """
+        :return: The cached array, or None if the column is not loaded.
+        """
+        return super().get((file, column, np.dtype(dtype)))
+
+    def put(self, file, column, dtype, array):
+        """
+        Adds a column, evicting the least recently used ones until the cache fits in its budget.
+        """
+        super().put((file, column, np.dtype(dtype)), array)
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+        super().clear()
+
+
+# Cache used by 'load_columns'
+dataset_cache = DatasetCache()
+
+
+def _csv_engine():
+    # Helper function, the pyarrow parser is multi-threaded and used whenever it is installed
+    try:
+        import pyarrow
+        return 'pyarrow'
+    except ImportError:
+        return 'c'
+
+
+# Extensions of the data files, anything unknown is read as csv. The last ones are the recordings
+# themselves, read with the parsers of 'conversion_functions' instead of converting them first.
+file_formats = {'.parquet': 'parquet', '.feather': 'feather', '.npz': 'npz', '.mmap': 'mmap',
+                '.cfg': 'comtrade', '.dat': 'comtrade', '.mat': 'mat', '.inf': 'pscad', '.out': 'pscad'}
+
+
+def _file_format(file):
+    # Helper function, format of a data file from its extension
+    return file_formats.get(os.path.splitext(file)[1].lower(), 'csv')
+
+
+# Memory-mapped format: magic, length of the JSON header (uint64, little endian), JSON header, then
+# every channel as one contiguous array starting at its own offset, aligned to 'MMAP_ALIGN' bytes.
+MMAP_MAGIC = b'PPTMMAP1'
+MMAP_ALIGN = 4096
+
+
+def unique_names(names):
+    """
+    Channel names made unique the way pandas reads a csv header, the repeats of 'Va' becoming 'Va.1', 'Va.2', ...
+    For the formats whose channels are looked up by name, so that channels sharing a name are all kept.
+
+    :param names: List of channel names
+    :return: List of unique names, in the same order.
+    """
+    seen = set()
+    unique = []
+    for name in map(str, names):
+        candidate, count = name, 0
+        while candidate in seen:
+            count += 1
+            candidate = f'{name}.{count}'
+        seen.add(candidate)
+        unique.append(candidate)
+    return unique
+
+
+def create_mmap(file, names, dtypes, length):
+    """
+    Creates a memory-mapped data file of 'length' samples per channel, to be filled in place.
+
+    :param file: Path of the '.mmap' file
+    :param names: List of channel names, repeated names are numbered (see 'unique_names')
+    :param dtypes: List of the data types of the channels
+    :param length: Number of samples
+    :return: List of writable arrays backed by the file, one per channel in the order of 'names'.
+    """
+    columns = [{'name': n, 'dtype': np.dtype(d).str} for n, d in zip(unique_names(names), dtypes)]
+
+    # The offsets depend on the size of the header, which contains them, so they are laid out
+    # after a header padded generously enough for any offset value
+    header_size = len(json.dumps({'length': length, 'columns': columns})) + 32 * len(columns) + 64
+    offset = -(-(len(MMAP_MAGIC) + 8 + header_size) // MMAP_ALIGN) * MMAP_ALIGN
+    for column in columns:
+        column['offset'] = offset
+        offset += -(-length * np.dtype(column['dtype']).itemsize // MMAP_ALIGN) * MMAP_ALIGN
+    header = json.dumps({'length': length, 'columns': columns}).encode().ljust(header_size)
+
+    with open(file, 'wb') as f:
+        f.write(MMAP_MAGIC)
+        f.write(np.uint64(len(header)).astype('<u8').tobytes())
+        f.write(header)
+        f.truncate(offset)
+
+    if length == 0:
+        return [np.empty(0, dtype=c['dtype']) for c in columns]
+    return [np.memmap(file, dtype=c['dtype'], mode='r+', offset=c['offset'], shape=(length,)) for c in columns]
+
+
+def truncate_mmap(file, length):
+    """
+    Shortens a memory-mapped data file to its first 'length' samples, when fewer samples were written than it was
+    created for. Only the header changes, the channels keep their offsets.
+
+    :param file: Path of the '.mmap' file
+    :param length: Number of samples
+    """
+    header = _mmap_header(file)
+    if length >= header['length']:
+        return
+    header['length'] = length
+    with open(file, 'r+b') as f:
+        size = int(np.frombuffer(f.read(len(MMAP_MAGIC) + 8)[len(MMAP_MAGIC):], dtype='<u8')[0])
+        f.write(json.dumps(header).encode().ljust(size))
+
+
+def write_mmap(df, file):
+    """
+    Writes the columns of a DataFrame in the memory-mapped format read by 'load_columns'.
+
+    :param df: DataFrame of numeric columns
+    :param file: Path of the '.mmap' file
+    """
+    arrays = [df.iloc[:, i].to_numpy() for i in range(df.shape[1])]
+    mapped = create_mmap(file, df.columns, [a.dtype for a in arrays], len(df))
+    for target, a in zip(mapped, arrays):
+        target[:] = a
+        if isinstance(target, np.memmap):
+            target.flush()
+
+
+def _mmap_header(file):
+    # Helper function, JSON header of a memory-mapped data file
+    with open(file, 'rb') as f:
+        if f.read(len(MMAP_MAGIC)) != MMAP_MAGIC:
+            raise ValueError(f'\'{file}\' is not a memory-mapped data file')
+        size = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+        return json.loads(f.read(size))
+
+
+def open_mmap(file, columns):
+    """
+    Maps the selected channels of a memory-mapped data file, nothing is read until the samples are accessed.
+
+    :param file: Path of the '.mmap' file
+    :param columns: List of column names
+    :return: Dictionary of read-only arrays backed by the file.
+    """
+    header = _mmap_header(file)
+    channels = {c['name']: c for c in header['columns']}
+    return {c: np.memmap(file, dtype=channels[c]['dtype'], mode='r', offset=channels[c]['offset'],
+                         shape=(header['length'],)) for c in columns}
+
+
+def _comtrade_files(file):
+    # Helper function, configuration and data files of a COMTRADE recording, from the path of either one
+    base = os.path.splitext(file)[0]
+    found = []
+    for extensions in (('.cfg', '.CFG'), ('.dat', '.DAT')):
+        paths = [base + e for e in extensions if os.path.exists(base + e)]
+        if not paths:
+            raise FileNotFoundError(f'No \'{extensions[0]}\' file found next to \'{file}\'')
+        found.append(paths[0])
+    return found
+
+
+def _load_cfg(file):
+    # Helper function, configuration (comtrade.Cfg) and data file of a COMTRADE recording
+    from comtrade import Cfg
+    cfg_path, dat_path = _comtrade_files(file)
+    cfg = Cfg()
+    cfg.load(cfg_path)
+    return cfg, dat_path
+
+
+def _pscad_project(file):
+    # Helper function, folder, '*.inf' file and files of the folder of a PSCAD project, from the path of
+    # its '*.inf' file or of one of its '*_NN.out' data files
+    folder, name = os.path.split(os.path.abspath(file))
+    if name.lower().endswith('.out'):
+        name = name[:-7] + '.inf'
+    return folder, name, os.listdir(folder)
+
+
+def _source_files(file):
+    # Helper function, every file the data of 'file' is read from: the '*.cfg' and '*.dat' files of a COMTRADE
+    # recording, the '*.inf' and '*_NN.out' files of a PSCAD project, the file itself otherwise
+    fmt = _file_format(file)
+    if fmt == 'comtrade':
+        return _comtrade_files(file)
+    elif fmt == 'pscad':
+        from conversion_functions import pscad_data_files
+        folder, inf_file, files = _pscad_project(file)
+        return [os.path.join(folder, f) for f in [inf_file] + pscad_data_files(inf_file, files)]
+    return [file]
+
+
+def read_header(file):
+    """
+    Column names of a data file, without parsing any of its rows.
+
+    :param file: Path of the data file (csv, Parquet, Feather, NPZ, memory-mapped, or a COMTRADE, MATLAB or PSCAD recording)
+    :return: List of column names.
+    """
+    fmt = _file_format(file)
+    if fmt == 'comtrade':
+        cfg, _ = _load_cfg(file)
+        return _comtrade_names(cfg)
+    elif fmt == 'mat':
+        from conversion_functions import mat_columns
+        return list(mat_columns(file))
+    elif fmt == 'pscad':
+        from conversion_functions import pscad_channels
+        folder, inf_file, files = _pscad_project(file)
+        return ['Time'] + [name for _, names in pscad_channels(inf_file, files, folder) for name in names]
+    elif fmt == 'parquet':
+        import pyarrow.parquet
+        names = pyarrow.parquet.read_schema(file).names
+        return [name for name in names if not name.startswith('__index_level_')]
+    elif fmt == 'feather':
+        import pyarrow
+        import pyarrow.ipc
+        with pyarrow.memory_map(file) as source:
+            return pyarrow.ipc.open_file(source).schema.names
+    elif fmt == 'npz':
+        with np.load(file) as npz:
+            return list(npz.files)
+    elif fmt == 'mmap':
+        return [c['name'] for c in _mmap_header(file)['columns']]
+    return list(pd.read_csv(file, nrows=0).columns)
+
+
+def _comtrade_names(cfg):
+    # Helper function, names of the time and of the channels of a COMTRADE recording, repeated names being numbered
+    return unique_names(['Time'] + [ch.name for ch in cfg.analog_channels] + [ch.name for ch in cfg.status_channels])
+
+
+def _read_comtrade(file, columns, dtype):
+    # Helper function for '_read_columns', streams the '*.dat' file keeping only the selected channels
+    from conversion_functions import comtrade_chunks
+    cfg, dat_path = _load_cfg(file)
+    names = _comtrade_names(cfg)
+    time = 'Time' in columns
+    # Channels are taken by position in the chunks, which keep the repeated names of the configuration
+    positions = {c: names.index(c) - (not time) for c in columns}
+    parts = {c: [] for c in columns}
+    for chunk in comtrade_chunks(cfg, dat_path, time=time):
+        for c in columns:
+            parts[c].append(chunk.iloc[:, positions[c]].to_numpy(dtype=dtype))
+    return {c: np.concatenate(p) if p else np.empty(0, dtype=dtype) for c, p in parts.items()}
+
+
+def _read_mat(file, columns, dtype):
+    # Helper function for '_read_columns', reads the selected variables, padded with NaN to the longest variable
+    # of the file like the converted files are
+    from conversion_functions import mat_columns, read_mat_columns
+    n = max(mat_columns(file).values())
+    loaded = {}
+    for c, a in read_mat_columns(file, columns).items():
+        loaded[c] = np.full(n, np.nan, dtype=dtype)
+        loaded[c][:len(a)] = a
+    return loaded
+
+
+def _read_pscad(file, columns, dtype):
+    # Helper function for '_read_columns', parses only the '*.out' files holding the selected channels
+    from conversion_functions import pscad_channels, read_out_file
+    folder, inf_file, files = _pscad_project(file)
+    channels = pscad_channels(inf_file, files, folder)
+    needed = [(data_file, names) for data_file, names in channels if any(c in names for c in columns)]
+    if not needed and 'Time' in columns:
+        # Every data file starts with the time
+        needed = channels[:1]
+
+    loaded = {}
+    for data_file, names in needed:
+        data = read_out_file(os.path.join(folder, data_file))
+        if 'Time' in columns and 'Time' not in loaded:
+            loaded['Time'] = data[:, 0].astype(dtype)
+        for c in columns:
+            if c in names:
+                loaded[c] = data[:, 1 + names.index(c)].astype(dtype)
+    return loaded
+
+
+def _read_columns(file, columns, dtype):
+    # Helper function for 'load_columns', parses only 'columns' of the file, returns a dictionary of arrays
+    fmt = _file_format(file)
+    if fmt == 'comtrade':
+        return _read_comtrade(file, columns, dtype)
+    elif fmt == 'mat':
+        return _read_mat(file, columns, dtype)
+    elif fmt == 'pscad':
+        return _read_pscad(file, columns, dtype)
+    elif fmt == 'parquet':
+        df = pd.read_parquet(file, columns=columns)
+    elif fmt == 'feather':
+        df = pd.read_feather(file, columns=columns)
+    elif fmt == 'npz':
+        with np.load(file) as npz:
+            return {c: npz[c].astype(dtype, copy=False) for c in columns}
+    elif fmt == 'mmap':
+        return {c: np.array(a, dtype=dtype) for c, a in open_mmap(file, columns).items()}
+    else:
+        df = pd.read_csv(file, usecols=columns, dtype={c: dtype for c in columns}, engine=_csv_engine())
+    return {c: df[c].to_numpy(dtype=dtype) for c in columns}
+
+
+def load_columns(file, columns, dtype=np.float64):
+    """
+    Loads the selected columns of a data file, columns already parsed for the same version of the file are reused.
+
+    :param file: Path of the data file (csv, Parquet, Feather, NPZ, memory-mapped, or a COMTRADE, MATLAB or PSCAD recording)
+    :param columns: List of column names
+    :param dtype: Data type of the columns, float64 or float32
+    :return: List of arrays, in the order of 'columns'.
+    """
+    file = os.path.abspath(file)
+    loaded = {}
+    if _file_format(file) == 'mmap':
+        # Channels stored with the requested dtype are mapped straight from the file, no copy and no caching
+        mapped = open_mmap(file, list(dict.fromkeys(columns)))
+        loaded = {c: a for c, a in mapped.items() if a.dtype == np.dtype(dtype)}
+
+    dataset_cache.validate(file, _source_files(file))
+
+    for c in dict.fromkeys(columns):
+        if c in loaded:
+            continue
+        column = dataset_cache.get(file, c, dtype)
+        if column is not None:
+            loaded[c] = column
+
+    missing = [c for c in dict.fromkeys(columns) if c not in loaded]
+    if missing:
+        parsed = _read_columns(file, missing, dtype)
+        for c in missing:
+            # Shared between plots, so protected against in-place changes
+            column = parsed[c]
+            column.flags.writeable = False
+            dataset_cache.put(file, c, dtype, column)
+            loaded[c] = column
+
+    return [loaded[c] for c in columns]
@@ -1,4 +1,5 @@
 import numpy as np
+from functools import lru_cache
 
 """
 Contains all the different functions required for the application
@@ -6,80 +7,117 @@ to apply the functions on the data uploaded.
 """
 
 
-def derivative(t, x):
+def derivative(t, x, method='backward', out=None):
     """
-    Derivation of a signal.
+    Derivation of a signal, using the actual spacing of the time array.
 
     :param t: Time array
     :param x: Signal array
+    :param method: 'backward' difference (first sample is zero) or second order 'central' difference
+    :param out: Optional float array of the length of 'x' (not 'x' itself) to write the result into
     :return: Array containing the derivative of the signal 'x'.
     """
-    h = t[1] - t[0]
-    y = np.zeros(len(t))
-    i = 1
-    while i <= len(x) - 1:
-        y[i] = (x[i] - x[i - 1]) / h
-        i = i + 1
+    t = np.asarray(t, dtype=float)
+    x = np.asarray(x, dtype=float)
+
+    if method == 'central':
+        if out is None:
+            return np.gradient(x, t)
+        out[:] = np.gradient(x, t)
+        return out
+    elif method != 'backward':
+        raise ValueError(f'Unknown derivative method \'{method}\'')
+
+    y = np.zeros(len(t)) if out is None else out
+    y[:1] = 0
+    np.subtract(x[1:], x[:-1], out=y[1:])
+    y[1:] /= np.diff(t)
     return y
 
 
-def integration(t, x):
+def integration(t, x, method='rectangle', out=None):
     """
-    Integration of a signal.
+    Integration of a signal, using the actual spacing of the time array.
 
     :param t: Time array
     :param x: Signal array
+    :param method: 'rectangle' (left endpoint) or 'trapezoidal' rule
+    :param out: Optional float array of the length of 'x' (not 'x' itself) to write the result into
     :return: Array containing the integration of the signal 'x'.
     """
-    h = t[1] - t[0]
-    y = np.zeros(len(t))
-    i = 1
-    while i <= len(x) - 1:
-        y[i] = y[i - 1] + h * (x[i - 1])
-        i = i + 1
+    t = np.asarray(t, dtype=float)
+    x = np.asarray(x, dtype=float)
+
+    y = np.zeros(len(t)) if out is None else out
+    y[:1] = 0
+    if method == 'rectangle':
+        np.multiply(np.diff(t), x[:-1], out=y[1:])
+    elif method == 'trapezoidal':
+        np.add(x[1:], x[:-1], out=y[1:])
+        y[1:] *= np.diff(t)
+        y[1:] *= 0.5
+    else:
+        raise ValueError(f'Unknown integration method \'{method}\'')
+    np.cumsum(y, out=y)
     return y
 
 
-def myhighpass(t, u, fc):
+def _lowpass_kernel(t, u, fc, zi):
+    # Helper function for 'mylowpass' and 'myhighpass', runs the backward Euler discretisation
+    # y[n] = (y[n-1] + h/tc * u[n]) / (1 + h/tc) as a compiled linear filter over the whole array.
+    from scipy.signal import lfilter
+
+    u = np.asarray(u)
+    if u.dtype != np.float32:
+        u = u.astype(np.float64, copy=False)
+
+    tc = 1 / (2 * np.pi * fc)
+    h = t[1] - t[0]
+    a1 = 1 / (1 + h / tc)
+    b = np.array([1 - a1], dtype=u.dtype)
+    a = np.array([1, -a1], dtype=u.dtype)
+
+    if zi is None:
+        # Output starts at the first input sample
+        zi = a1 * u[:1]
+    zi = np.asarray(zi, dtype=u.dtype).reshape(1)
+    return lfilter(b, a, u, zi=zi)
+
+
+def myhighpass(t, u, fc, zi=None, return_state=False):
     """
     First order high pass filter.
 
     :param t: Time array
     :param u: Signal array
     :param fc: Cut-off frequency for the filter
-    :return: Array showing the high-pass output of signal 'x' based on cutoff frequency 'tc'.
-    """
-    tc = 1/(2 * np.pi * fc)
-    x = [u[0]]
-    y = np.zeros(len(t))
-    h = t[1] - t[0]
-    for i in range(len(t) - 1):
-        y1 = (x[i] + (h / tc * u[i + 1])) / (1 + h / tc)
-        x.append(y1)
-    for k in range(len(t)):
-        y[k] = -x[k] + u[k]
+    :param zi: Filter state returned by a previous call, to continue filtering the next chunk of a signal
+    :param return_state: If True the final filter state is returned as well
+    :return: Array showing the high-pass output of signal 'x' based on cutoff frequency 'tc',
+             and the final filter state if 'return_state' is True.
+    """
+    x, zf = _lowpass_kernel(t, u, fc, zi)
+    y = np.subtract(np.asarray(u), x, out=x)
+    if return_state:
+        return [y, zf]
     return y
 
 
-def mylowpass(t, u, fc):
+def mylowpass(t, u, fc, zi=None, return_state=False):
     """
     First order low pass filter.
 
     :param t: Time array
     :param u: Signal array
     :param fc: Cut-off frequency for the filter
-    :return: Array showing the low-pass output of signal 'x' based on cutoff frequency 'tc'.
-    """
-
-    tc = 1 / (2 * np.pi * fc)
-    x = [u[0]]
-    y = np.zeros(len(t))
-    h = t[1] - t[0]
-    for i in range(len(t) - 1):
-        y1 = (x[i] + (h / tc * u[i + 1])) / (1 + h / tc)
-        x.append(y1)
-    for k in range(len(t)):
-        y[k] = x[k]
+    :param zi: Filter state returned by a previous call, to continue filtering the next chunk of a signal
+    :param return_state: If True the final filter state is returned as well
+    :return: Array showing the low-pass output of signal 'x' based on cutoff frequency 'tc',
+             and the final filter state if 'return_state' is True.
+    """
+    y, zf = _lowpass_kernel(t, u, fc, zi)
+    if return_state:
+        return [y, zf]
     return y
 
 
@@ -93,39 +131,87 @@ def mw_dft(data, t, omega):
     :return: A complex number representing phasor quantity.
     """
 
-    X_data = 0
-    win_len = len(t)
-    for k in range(len(t)):
-        X_data = X_data + data[k] * np.exp((-omega * t[k] * 1j))
-    X_data = np.sqrt(2) / win_len * X_data
+    data = np.asarray(data, dtype=float)
+    t = np.asarray(t, dtype=float)
+    X_data = np.sum(data * np.exp(-1j * omega * t))
+    X_data = np.sqrt(2) / len(t) * X_data
     return X_data
 
 
-# Take frequency as input as well
-def window_phasor_mag(t, x, sr, cycles, dom_freq=50):
+def sliding_dft(t, x, omega, period, block=65536):
     """
-    Magnitude of moving discrete fourier transform.
+    Recursive (sliding) DFT of a signal, evaluated for every window position at once.
+
+    Each output is the previous one plus the sample entering the window minus the one leaving it,
+    which is carried out as a cumulative sum so the whole signal is processed in O(N).
+    When 'omega' is an array all frequencies are evaluated together, one matrix product per block of samples.
+
+    :param t: Time array
+    :param x: Signal array
+    :param omega: Frequency (in rad/s), or an array of frequencies
+    :param period: Window length in samples
+    :param block: Number of samples rotated at once, bounds the temporary memory for many frequencies
+    :return: A complex number array, element 'i' is 'mw_dft' of the window x[i - period:i] (zero for i < period).
+             Shape is (len(omega), len(x)) when 'omega' is an array.
+    """
+    t = np.asarray(t, dtype=float)
+    x = np.asarray(x, dtype=float)
+    w = np.atleast_1d(np.asarray(omega, dtype=float))[:, None]
+    period = int(period)
+    n = len(x)
+
+    X = np.zeros((len(w), n), dtype=np.complex128)
+    if period < 1 or period >= n:
+        return X if np.ndim(omega) else X[0]
+
+    # S[:, k] holds the sum of the first 'k' rotated samples, S[:, 0] = 0
+    S = np.empty((len(w), n + 1), dtype=np.complex128)
+    S[:, 0] = 0
+    for k in range(0, n, block):
+        rot = np.exp(-1j * w * t[None, k:k + block])
+        rot *= x[None, k:k + block]
+        np.cumsum(rot, axis=1, out=S[:, k + 1:k + 1 + block])
+        S[:, k + 1:k + 1 + block] += S[:, k:k + 1]
+
+    np.subtract(S[:, period:-1], S[:, :-period - 1], out=X[:, period:])
+    X *= np.sqrt(2) / period
+    return X if np.ndim(omega) else X[0]
+
+
+def window_phasor(t, x, sr, cycles, dom_freq=50):
+    """
+    Moving discrete fourier transform, magnitude and angle from a single pass.
 
     :param t: Time array
     :param x: Signal array
     :param sr: Down-sampling factor
     :param cycles: Window size as per number of cycles
     :param dom_freq: Fundamental frequency
-    :return: A complex number array of calculated fundamental phasor.
+    :return: Magnitude array, angle array (in degrees) of the fundamental phasor and the down-sampled time array.
     """
-    x = list(x)
-    t = list(t)
-    va = x[0::sr]
-    t = t[0::sr]
-    tnew = t
+    va = np.asarray(x, dtype=float)[0::sr]
+    tnew = np.asarray(t, dtype=float)[0::sr]
     h = tnew[1] - tnew[0]
 
-    va_mw = np.zeros(len(va), dtype='complex_')
     period = round(cycles / (dom_freq * h))
+    va_mw = sliding_dft(tnew, va, dom_freq * 2 * np.pi, period)
+    return [np.abs(va_mw), np.angle(va_mw, deg=True), tnew]
+
 
-    for i in range(period, len(t)):
-        va_mw[i] = mw_dft(va[i - period:i], t[i - period:i], dom_freq * 2 * np.pi)
-    return [abs(va_mw), tnew]
+# Take frequency as input as well
+def window_phasor_mag(t, x, sr, cycles, dom_freq=50):
+    """
+    Magnitude of moving discrete fourier transform.
+
+    :param t: Time array
+    :param x: Signal array
+    :param sr: Down-sampling factor
+    :param cycles: Window size as per number of cycles
+    :param dom_freq: Fundamental frequency
+    :return: Magnitude array of calculated fundamental phasor and the down-sampled time array.
+    """
+    mag, _, tnew = window_phasor(t, x, sr, cycles, dom_freq)
+    return [mag, tnew]
 
 
 def window_phasor_angle(t, x, sr, cycles, dom_freq=50):
@@ -137,21 +223,59 @@ def window_phasor_angle(t, x, sr, cycles, dom_freq=50):
     :param sr: Down-sampling factor
     :param cycles: Window size as per number of cycles
     :param dom_freq: Fundamental frequency
-    :return: A complex number array of calculated fundamental phasor.
+    :return: Angle array (in degrees) of calculated fundamental phasor and the down-sampled time array.
+    """
+    _, angle, tnew = window_phasor(t, x, sr, cycles, dom_freq)
+    return [angle, tnew]
+
+
+def window_phasor_harmonics(t, x, sr, cycles, harmonics, dom_freq=50):
     """
-    x = list(x)
-    t = list(t)
-    va = x[0::sr]
-    t = t[0::sr]
-    tnew = t
+    Moving discrete fourier transform of several harmonics in a single pass.
+
+    :param t: Time array
+    :param x: Signal array
+    :param sr: Down-sampling factor
+    :param cycles: Window size as per number of cycles of the fundamental
+    :param harmonics: List of harmonic orders, or an integer 'N' for all harmonics from 1 to N
+    :param dom_freq: Fundamental frequency
+    :return: A (harmonics x samples) complex number array of phasors and the down-sampled time array.
+    """
+    if np.ndim(harmonics) == 0:
+        orders = np.arange(1, int(harmonics) + 1)
+    else:
+        orders = np.asarray(harmonics, dtype=float)
+
+    va = np.asarray(x, dtype=float)[0::sr]
+    tnew = np.asarray(t, dtype=float)[0::sr]
     h = tnew[1] - tnew[0]
 
-    va_mw = np.zeros(len(va), dtype='complex_')
     period = round(cycles / (dom_freq * h))
+    va_mw = sliding_dft(tnew, va, orders * dom_freq * 2 * np.pi, period)
+    return [va_mw, tnew]
+
 
-    for i in range(period, len(t)):
-        va_mw[i] = mw_dft(va[i - period:i], t[i - period:i], dom_freq * 2 * np.pi)
-    return [np.angle(va_mw, deg=True), tnew]
+@lru_cache(maxsize=2)
+def _trend_factor(nobs, lambda1):
+    # Helper function for 'trendfilter', banded Cholesky factor of the pentadiagonal matrix I + lambda * K'K,
+    # K being the (nobs - 2) x nobs second difference matrix. Cached per (nobs, lambda), the factors take 3 * nobs
+    # floats each so only the last two are kept.
+    from scipy.linalg import cholesky_banded
+
+    # Upper banded storage: row 2 is the diagonal, rows 1 and 0 the first and second super-diagonals
+    ab = np.zeros((3, nobs))
+    ab[2, 0:nobs - 2] += 1
+    ab[2, 1:nobs - 1] += 4
+    ab[2, 2:nobs] += 1
+    ab[1, 1:nobs - 1] -= 2
+    ab[1, 2:nobs] -= 2
+    ab[0, 2:nobs] = 1
+    ab *= lambda1
+    ab[2] += 1
+
+    factor = cholesky_banded(ab)
+    factor.flags.writeable = False
+    return factor
 
 
 def trendfilter(t, x, lambda1):
@@ -165,212 +289,276 @@ def trendfilter(t, x, lambda1):
     :return: An array of smooth version of signal 'x', depending on parameter 'lambda', and a new down-sampled time array.
 
     """
-    from scipy import sparse
-    from statsmodels.tools.validation import array_like, PandasWrapper
-    from scipy.sparse.linalg import spsolve
+    from scipy.linalg import cho_solve_banded
 
     time = t
-    pw = PandasWrapper(x)
     nobs = len(t)
-    I = sparse.eye(nobs, nobs)
-    offsets = np.array([0, 1, 2])
-    data = np.repeat([[1.], [-2.], [1.]], nobs, axis=1)
-    K = sparse.dia_matrix((data, offsets), shape=(nobs - 2, nobs))
+    trend = cho_solve_banded((_trend_factor(nobs, float(lambda1)), False), np.asarray(x, dtype=float))
+
+    if hasattr(x, 'index'):
+        # Keep the index of pandas input
+        name = 'trend' if x.name is None else f'{x.name}_trend'
+        trend = type(x)(trend, index=x.index, name=name)
+
+    return trend, time
 
-    use_umfpack = True
-    trend = spsolve(I + lambda1 * K.T.dot(K), x, use_umfpack=use_umfpack)
 
-    return pw.wrap(trend, append='trend'), time
+def _moving_sum(v, tw, block=65536, out=None):
+    # Helper function for 'avgMovWin' and 'rmsMovWin', element 'i' is sum(v[int(i - tw):i]) for i >= int(tw).
+    # Running sums are restarted for every block of outputs, so the rounding error is bounded by the
+    # block length instead of growing with the length of the signal.
+    v = np.asarray(v, dtype=float)
+    N = len(v)
+    if out is None:
+        s = np.zeros(N)
+    else:
+        s = out
+        s[:int(tw)] = 0
+    block = max(block, int(tw) + 1)
 
+    for k in range(int(tw), N, block):
+        idx = np.arange(k, min(k + block, N))
+        start = np.trunc(idx - tw).astype(np.intp)
+        base = start[0]
+        S = np.zeros(idx[-1] - base + 1)
+        np.cumsum(v[base:idx[-1]], out=S[1:])
+        s[idx] = S[idx - base] - S[start - base]
+    return s
 
-def avgMovWin(t, v, t_win):
+
+def avgMovWin(t, v, t_win, out=None):
     """
     Moving window average of the signal.
 
     :param t: Time array
     :param v: Signal array
     :param t_win: Window length in seconds
+    :param out: Optional float array of the length of 'v' (not 'v' itself) to write the result into
     :return: Array representing the average of signal using a moving window.
     """
-    N = len(t)
     h = t[1] - t[0]
     tw = t_win / h
-    avg = np.zeros(N)
-
-    for i in range(int(tw), N):
-        sum1 = 0
-        for j in range(int(i - tw), i):
-            sum1 += v[j]
-            avg[i] = sum1 / tw
+    avg = _moving_sum(v, tw, out=out)
+    avg /= tw
     return avg
 
 
-def rmsMovWin(t, v, t_win):
+def rmsMovWin(t, v, t_win, out=None):
     """
     Moving window RMS of the signal.
 
     :param t: Time array
     :param v: Signal array
     :param t_win: Window length in seconds
+    :param out: Optional float array of the length of 'v' (not 'v' itself) to write the result into
     :return: Array representing the RMS of signal using a moving window.
     """
-    N = len(t)
     h = t[1] - t[0]
     tw = t_win / h
-    rms = np.zeros(N)
+    v = np.asarray(v, dtype=float)
+    rms = _moving_sum(v * v, tw, out=out)
+    # Cancellation in the running sum can leave tiny negative values where the signal is zero
+    np.maximum(rms, 0, out=rms)
+    rms /= tw
+    return np.sqrt(rms, out=rms)
+
+
+# Constant transformation matrices, computed once at import
+_CLARKE = np.linalg.inv(np.sqrt(2 / 3) * np.array([[1, 0, np.sqrt(0.5)],
+                                                   [-0.5, -np.sqrt(3) / 2, np.sqrt(0.5)],
+                                                   [-0.5, np.sqrt(3) / 2, np.sqrt(0.5)]]))
+
+_INV_CLARKE = np.linalg.inv(np.sqrt(2 / 3) * np.array([[1, -0.5, -0.5],
+                                                       [0, -np.sqrt(3) / 2, np.sqrt(3) / 2],
+                                                       [np.sqrt(0.5), np.sqrt(0.5), np.sqrt(0.5)]]))
 
-    for i in range(int(tw), N):
-        sum1 = 0
-        for j in range(int(i - tw), i):
-            sum1 += v[j] ** 2
-        rms[i] = np.sqrt(sum1 / tw)
-    return rms
+# Stationary part of Park's matrix, the rows are rotated by the angle afterwards
+_PARK = np.sqrt(2 / 3) * np.array([[1, np.cos(2 * np.pi / 3), np.cos(4 * np.pi / 3)],
+                                   [0, np.sin(2 * np.pi / 3), np.sin(4 * np.pi / 3)],
+                                   [np.sqrt(0.5), np.sqrt(0.5), np.sqrt(0.5)]])
 
+# Only the real part of the sequence components is returned, so only the real part of the matrix is needed
+_a = np.exp(2 * np.pi * 1j / 3)
+_SEQUENCE = np.real(np.linalg.inv(np.array([[1, 1, 1],
+                                            [_a ** 2, _a, 1],
+                                            [_a, _a ** 2, 1]])))
 
-def clarkestranform(t, va, vb, vc):
+
+def _stack(va, vb, vc):
+    # Helper function, the three phases as a (3, N) float array. An already stacked array ('vb' and 'vc' omitted)
+    # is used as it is, without copying it.
+    if vb is None and vc is None:
+        return np.asarray(va, dtype=float)
+    return np.array([np.asarray(va, dtype=float), np.asarray(vb, dtype=float), np.asarray(vc, dtype=float)])
+
+
+def clarkestranform(t, va, vb=None, vc=None, out=None):
     """
     Transforms 3 phase to alpha, beta, zero components.
 
     :param t: Time array
-    :param va: a phase voltage array
-    :param vb: b phase voltage array
-    :param vc: c phase voltage array
+    :param va: a phase voltage array, or a stacked (3, N) array of all three phases
+    :param vb: b phase voltage array, omitted when 'va' is stacked
+    :param vc: c phase voltage array, omitted when 'va' is stacked
+    :param out: Optional (3, N) array the result is written into
     :return: 3 arrays corresponding to alpha, beta, zero component.
     """
-    mat = [[1, 0, np.sqrt(0.5)],
-           [-0.5, -np.sqrt(3) / 2, np.sqrt(0.5)],
-           [-0.5, np.sqrt(3) / 2, np.sqrt(0.5)]]
-    mat = np.array(mat)
-    B = np.linalg.inv(np.sqrt(2 / 3) * mat)
-    fabg = np.zeros([3, len(t)])
-    for i in range(len(t)):
-        for k in range(np.shape(fabg)[0]):
-            fabg[k][i] = np.dot(B, [[va[i]], [vb[i]], [vc[i]]])[k]
+    fabg = np.matmul(_CLARKE, _stack(va, vb, vc), out=out)
     return [fabg[0], fabg[1], fabg[2]]
 
 
-def inv_clarkestransform(t, va, vb, vc):
+def inv_clarkestransform(t, va, vb=None, vc=None, out=None):
     """
     Inverse of Clarke's transform, converts alpha, beta, zero component to a,b,c component.
 
     :param t: Time array
-    :param va: alpha component array
-    :param vb: beta component array
-    :param vc: zero component array
+    :param va: alpha component array, or a stacked (3, N) array of all three components
+    :param vb: beta component array, omitted when 'va' is stacked
+    :param vc: zero component array, omitted when 'va' is stacked
+    :param out: Optional (3, N) array the result is written into
     :return: 3 arrays corresponding to a,b,c component.
     """
-    mat = [[1, -0.5, -0.5],
-           [0, -np.sqrt(3) / 2, np.sqrt(3) / 2],
-           [np.sqrt(0.5), np.sqrt(0.5), np.sqrt(0.5)]]
-    mat = np.array(mat)
-    B = np.linalg.inv(np.sqrt(2 / 3) * mat)
-    fabg = np.zeros([3, len(t)])
-    for i in range(len(t)):
-        for k in range(np.shape(fabg)[0]):
-            fabg[k][i] = np.dot(B, [[va[i]], [vb[i]], [vc[i]]])[k]
+    fabg = np.matmul(_INV_CLARKE, _stack(va, vb, vc), out=out)
     return [fabg[0], fabg[1], fabg[2]]
 
 
-def parkstransform(t, va, vb, vc, w, gamma):
+def parkstransform(t, va, vb, vc, w, gamma, out=None, work=None):
     """
     Transforms 3 phase to D,Q,0 components.
 
+    With a stacked input, 'out' and 'work', no array is allocated, repeated transforms can reuse the same buffers.
+
     :param t: Time array
-    :param va: a component array
-    :param vb: b component array
-    :param vc: c component array
+    :param va: a component array, or a stacked (3, N) array of all three phases
+    :param vb: b component array, None when 'va' is stacked
+    :param vc: c component array, None when 'va' is stacked
     :param w: Frequency (in Hertz)
     :param gamma: Phase angle (in Radian)
+    :param out: Optional (3, N) array the result is written into
+    :param work: Optional (3, N) float array used as scratch space
     :return: 3 arrays corresponding to D,Q,0 component respectively.
     """
-    fdqo = np.zeros([3, len(t)])
-    for i in range(len(t)):
-        a = (w * t[i]) + gamma
-        mat = [[np.cos(a), np.cos(a - (2 * np.pi / 3)), np.cos(a - (4 * np.pi / 3))],
-               [np.sin(a), np.sin(a - (2 * np.pi / 3)), np.sin(a - (4 * np.pi / 3))],
-               [np.sqrt(0.5), np.sqrt(0.5), np.sqrt(0.5)]]
-        mat = np.array(mat)
-        B = np.sqrt(2 / 3) * mat
-        for k in range(np.shape(fdqo)[0]):
-            fdqo[k][i] = np.dot(B, [[va[i]], [vb[i]], [vc[i]]])[k]
+    x = _stack(va, vb, vc)
+    fdqo = np.empty(x.shape) if out is None else out
+    s = np.empty(x.shape) if work is None else work
+
+    # Stationary components, the zero component is final
+    np.matmul(_PARK, x, out=s)
+    fdqo[2] = s[2]
+
+    # Rotate the stationary components: d = cos(a) x + sin(a) y, q = sin(a) x - cos(a) y, with the rows of 'fdqo'
+    # holding sin(a) and cos(a) until they are overwritten by the result
+    sin_a, cos_a = fdqo[0], fdqo[1]
+    np.multiply(t, w, out=sin_a)
+    sin_a += gamma
+    np.cos(sin_a, out=cos_a)
+    np.sin(sin_a, out=sin_a)
+
+    np.multiply(sin_a, s[0], out=s[2])
+    s[0] *= cos_a
+    np.multiply(sin_a, s[1], out=fdqo[0])
+    fdqo[0] += s[0]
+    np.multiply(cos_a, s[1], out=fdqo[1])
+    np.subtract(s[2], fdqo[1], out=fdqo[1])
     return [fdqo[0], fdqo[1], fdqo[2]]
 
 
-def inv_parkstransform(t, va, vb, vc, w, gamma):
+def inv_parkstransform(t, va, vb, vc, w, gamma, out=None, work=None):
     """
     Inverse of Park's transform, transforms D,Q,0 phase to a,b,c components.
 
+    With a stacked input, 'out' and 'work', no array is allocated, repeated transforms can reuse the same buffers.
+
     :param t: Time array
-    :param va: D component array
-    :param vb: Q component array
-    :param vc: 0 component array
+    :param va: D component array, or a stacked (3, N) array of all three components
+    :param vb: Q component array, None when 'va' is stacked
+    :param vc: 0 component array, None when 'va' is stacked
     :param w: Frequency (in Hertz)
     :param gamma: Phase angle (in Radian)
+    :param out: Optional (3, N) array the result is written into
+    :param work: Optional (3, N) float array used as scratch space
     :return: 3 arrays corresponding to a,b,c component respectively.
     """
-    w1 = 2 * np.pi * w
-    fdqo = np.zeros([3, len(t)])
-    for i in range(len(t)):
-        a = (w1 * t[i]) + gamma
-        mat = [[np.cos(a), np.sin(a), np.sqrt(0.5)],
-               [np.cos(a - (2 * np.pi / 3)), np.sin(a - (2 * np.pi / 3)), np.sqrt(0.5)],
-               [np.cos(a - (4 * np.pi / 3)), np.sin(a - (4 * np.pi / 3)), np.sqrt(0.5)]]
-        mat = np.array(mat)
-        B = np.sqrt(2 / 3) * mat
-        for k in range(np.shape(fdqo)[0]):
-            fdqo[k][i] = np.dot(B, [[va[i]], [vb[i]], [vc[i]]])[k]
+    x = _stack(va, vb, vc)
+    fdqo = np.empty(x.shape) if out is None else out
+    s = np.empty(x.shape) if work is None else work
+
+    # Rotate back to the stationary frame: x = cos(a) d + sin(a) q, y = sin(a) d - cos(a) q, into 'work', the rows
+    # of 'fdqo' holding sin(a), cos(a) and the products until the final product
+    sin_a, cos_a, product = fdqo[0], fdqo[1], fdqo[2]
+    np.multiply(t, 2 * np.pi * w, out=sin_a)
+    sin_a += gamma
+    np.cos(sin_a, out=cos_a)
+    np.sin(sin_a, out=sin_a)
+
+    np.multiply(cos_a, x[0], out=s[0])
+    np.multiply(sin_a, x[1], out=product)
+    s[0] += product
+    np.multiply(sin_a, x[0], out=s[1])
+    np.multiply(cos_a, x[1], out=product)
+    s[1] -= product
+    s[2] = x[2]
+
+    np.matmul(_PARK.T, s, out=fdqo)
     return [fdqo[0], fdqo[1], fdqo[2]]
 
 
-def sequencetransform(t, va, vb, vc):
+def sequencetransform(t, va, vb=None, vc=None, out=None):
     """
+    Transforms 3 phase to positive, negative and zero sequence components (real part).
 
     :param t: Time array
-    :param va: a component array
-    :param vb: b component array
-    :param vc: c component array
-    :return:
-    """
-    a = np.exp(2 * np.pi * 1j / 3)
-    mat = [[1, 1, 1],
-           [a ** 2, a, 1],
-           [a, a ** 2, 1]]
-    mat = np.array(mat)
-    B = np.linalg.inv(mat)
-    fpno = np.zeros([3, len(t)], dtype='complex_')
-    for i in range(len(t)):
-        for k in range(np.shape(fpno)[0]):
-            fpno[k][i] = np.dot(B, [[va[i]], [vb[i]], [vc[i]]])[k]
-    return [np.real(fpno[0]), np.real(fpno[1]), np.real(fpno[2])]
-
-
-def instaLL_RMSVoltage(t, va, vb, vc):
+    :param va: a component array, or a stacked (3, N) array of all three phases
+    :param vb: b component array, omitted when 'va' is stacked
+    :param vc: c component array, omitted when 'va' is stacked
+    :param out: Optional (3, N) array the result is written into
+    :return: 3 arrays corresponding to positive, negative and zero sequence component respectively.
+    """
+    fpno = np.matmul(_SEQUENCE, _stack(va, vb, vc), out=out)
+    return [fpno[0], fpno[1], fpno[2]]
+
+
+def three_phase_norm(va, vb=None, vc=None, out=None):
+    """
+    Fused three phase reduction sqrt(a^2 + b^2 + c^2), evaluated without intermediate arrays.
+
+    :param va: a phase array, or a stacked (3, N) array of all three phases
+    :param vb: b phase array, omitted when 'va' is stacked
+    :param vc: c phase array, omitted when 'va' is stacked
+    :param out: Optional array of length N the result is written into
+    :return: Array corresponding to the norm of the three phases.
+    """
+    if vb is None:
+        va, vb, vc = np.asarray(va, dtype=float)
+    out = np.hypot(np.asarray(va, dtype=float), np.asarray(vb, dtype=float), out=out)
+    return np.hypot(out, np.asarray(vc, dtype=float), out=out)
+
+
+def instaLL_RMSVoltage(t, va, vb=None, vc=None, out=None):
     """
     Instantaneous line to line RMS voltage.
 
     :param t: Time array
-    :param va: a phase voltage
+    :param va: a phase voltage, or a stacked (3, N) array of all three phase voltages
     :param vb: b phase voltage
     :param vc: c phase voltage
+    :param out: Optional array the result is written into
     :return: Array corresponding to the instantaneous RMS voltage
     """
-    v_rms = np.zeros(len(t))
-    for i in range(len(t)):
-        v_rms[i] = np.sqrt(va[i] ** 2 + vb[i] ** 2 + vc[i] ** 2)
-    return v_rms
+    return three_phase_norm(va, vb, vc, out=out)
 
 
-def insta_RMSCurrent(t, ia, ib, ic):
+def insta_RMSCurrent(t, ia, ib=None, ic=None, out=None):
     """
     Instantaneous line current.
 
     :param t: Time array
-    :param ia: a phase current
+    :param ia: a phase current, or a stacked (3, N) array of all three phase currents
     :param ib: b phase current
     :param ic: c phase current
+    :param out: Optional array the result is written into
     :return: Array corresponding to the instantaneous line current.
     """
-    i_rms = np.zeros(len(t))
-    for i in range(len(t)):
-        i_rms[i] = (1 / np.sqrt(3)) * np.sqrt(ia[i] ** 2 + ib[i] ** 2 + ic[i] ** 2)
+    i_rms = three_phase_norm(ia, ib, ic, out=out)
+    i_rms *= 1 / np.sqrt(3)
     return i_rms
@@ -0,0 +1,141 @@
+import numpy as np
+
+"""
+Level of detail rendering of long signals, only about two points per screen pixel are
+handed to the plot widget whatever the length of the signal.
+"""
+
+
+class MinMaxPyramid:
+    """
+    Minimum and maximum of a signal over bins of 2, 4, 8, ... samples.
+
+    Building the pyramid costs O(N) once, after which the envelope of any range of the signal
+    at any resolution is sliced out of the matching level. Peaks and transients are kept since
+    every bin contributes both its minimum and its maximum.
+    """
+
+    # Levels are built until they hold fewer bins than this
+    min_bins = 1024
+
+    def __init__(self, t, y):
+        self.t = np.asarray(t, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.levels = []
+
+        # The envelope is looked up by time, so only monotonic time arrays are decimated
+        if len(self.t) != len(self.y) or np.any(np.diff(self.t) < 0):
+            return
+
+        mins = maxs = self.y
+        size = 1
+        while len(mins) > 2 * self.min_bins:
+            if len(mins) % 2:
+                mins = np.append(mins, mins[-1])
+                maxs = np.append(maxs, maxs[-1])
+            # fmin/fmax skip NaN gaps instead of spreading them over the whole bin
+            mins = np.fmin(mins[0::2], mins[1::2])
+            maxs = np.fmax(maxs[0::2], maxs[1::2])
+            size *= 2
+            self.levels.append((size, mins, maxs))
+
+    def _bins(self, level, b0, b1):
+        # Helper function, interleaved (time, value) points of bins b0 to b1 of a level
+        size, mins, maxs = level
+        starts = np.arange(b0, b1) * size
+        ends = np.minimum(starts + size, len(self.t)) - 1
+        x = np.empty(2 * len(starts))
+        y = np.empty(2 * len(starts))
+        x[0::2] = self.t[starts]
+        x[1::2] = self.t[ends]
+        y[0::2] = mins[b0:b1]
+        y[1::2] = maxs[b0:b1]
+        return x, y
+
+    def envelope(self, x0, x1, pixels):
+        """
+        Points to draw for the time range [x0, x1] on a plot 'pixels' wide.
+
+        The visible range is drawn at about two points per pixel (full resolution once zoomed in
+        far enough), the rest of the signal with the coarsest level so the bounds of the curve stay
+        those of the whole signal.
+
+        :param x0: Start of the visible time range
+        :param x1: End of the visible time range
+        :param pixels: Width of the plot in pixels
+        :return: Time and signal arrays to plot.
+        """
+        if not self.levels:
+            return self.t, self.y
+
+        N = len(self.t)
+        coarse = self.levels[-1]
+        size = coarse[0]
+
+        # Visible samples, widened to the bins of the coarsest level
+        i0 = max(int(np.searchsorted(self.t, x0, 'left')) - 1, 0)
+        i1 = min(int(np.searchsorted(self.t, x1, 'right')) + 1, N)
+        c0 = i0 // size
+        c1 = min(-(-i1 // size), len(coarse[1]))
+        i0 = c0 * size
+        i1 = min(c1 * size, N)
+
+        # Coarsest level that still has at least 'pixels' bins in the visible range
+        level = None
+        for candidate in self.levels:
+            if (i1 - i0) / candidate[0] < pixels:
+                break
+            level = candidate
+
+        if level is None:
+            x, y = self.t[i0:i1], self.y[i0:i1]
+        else:
+            x, y = self._bins(level, i0 // level[0], -(-i1 // level[0]))
+
+        left = self._bins(coarse, 0, c0)
+        right = self._bins(coarse, c1, len(coarse[1]))
+        return np.concatenate((left[0], x, right[0])), np.concatenate((left[1], y, right[1]))
+
+
+class LODCurve:
+    """
+    Keeps a pyqtgraph curve showing the envelope of a 'MinMaxPyramid' that matches its view.
+
+    The curve is refreshed on every change of the x range or size of its view box, and stops
+    following the view once it has been removed from the plot.
+    """
+
+    def __init__(self, item, pyramid):
+        self.item = item
+        self.pyramid = pyramid
+        self.view = item.getViewBox()
+        self.view.sigXRangeChanged.connect(self.update)
+        self.view.sigResized.connect(self.update)
+        self.update()
+
+    def update(self, *args):
+        if self.item.scene() is None:
+            self.view.sigXRangeChanged.disconnect(self.update)
+            self.view.sigResized.disconnect(self.update)
+            return
+
+        (x0, x1), _ = self.view.viewRange()
+        pixels = max(int(self.view.width()), 100)
+        self.item.setData(*self.pyramid.envelope(x0, x1, pixels))
+
+
+def plot_lod(plotwidget, pyramid, **kwargs):
+    """
+    Adds a curve to a pyqtgraph plot widget, drawn with level of detail rendering when the signal is long.
+
+    :param plotwidget: pyqtgraph PlotWidget
+    :param pyramid: 'MinMaxPyramid' of the curve
+    :param kwargs: Passed on to 'plotwidget.plot' (pen, name, ...)
+    :return: The plotted curve.
+    """
+    if not pyramid.levels:
+        return plotwidget.plot(pyramid.t, pyramid.y, **kwargs)
+
+    item = plotwidget.plot([], [], **kwargs)
+    item.lod = LODCurve(item, pyramid)
+    return item
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+
+"""
+Least recently used cache within a memory budget, the base of the caches of the loaded columns
+('data_loader') and of the results of the functions ('result_cache').
+"""
+
+
+class MemoryCache:
+    """
+    Entries evicted least recently used first once their size exceeds 'max_bytes', the most recent
+    entry is always kept even if it is larger than the budget. Shared by the worker threads, every
+    access holds a lock.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :return: The cached entry, or None if 'key' is not cached.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+            return entry
+
+    def put(self, key, entry):
+        """
+        Adds an entry, evicting the least recently used ones until the cache fits in its budget.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.nbytes += self._size(entry)
+
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """
+        :return: Dictionary with the hit/miss counts and the memory used by the cache.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._entries), 'nbytes': self.nbytes, 'max_bytes': self.max_bytes}
+
+    def _lookup(self, key):
+        # Called with the lock held, the entry of 'key' marked as recently used, None if it is not cached.
+        # Counts the hits only, the callers decide what a miss is.
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key]
+
+    def _remove(self, key):
+        # Called with the lock held
+        self.nbytes -= self._size(self._entries.pop(key))
+
+    def _size(self, entry):
+        # Memory used by an entry, an array by default
+        return entry.nbytes
@@ -0,0 +1,182 @@
+import threading
+import numpy as np
+from functions import *
+
+"""
+Chains of operations of 'functions' applied to a signal, such as a low pass filter followed by a
+windowed phasor and a moving RMS, evaluated in a single pass without going through a file between
+the operations.
+"""
+
+
+# Operations of a pipeline, each one maps (time, signal, output buffer, parameters) to a new (time, signal).
+# The operations taking an output buffer write their result into it when the pipeline hands one over.
+def _lowpass(t, x, out, fc):
+    return t, mylowpass(t, x, fc)
+
+
+def _highpass(t, x, out, fc):
+    return t, myhighpass(t, x, fc)
+
+
+def _derivative(t, x, out, method='backward'):
+    return t, derivative(t, x, method, out=out)
+
+
+def _integration(t, x, out, method='rectangle'):
+    return t, integration(t, x, method, out=out)
+
+
+def _phasor_mag(t, x, out, sr, cycles, dom_freq=50):
+    mag, tnew = window_phasor_mag(t, x, sr, cycles, dom_freq)
+    return tnew, mag
+
+
+def _phasor_angle(t, x, out, sr, cycles, dom_freq=50):
+    angle, tnew = window_phasor_angle(t, x, sr, cycles, dom_freq)
+    return tnew, angle
+
+
+def _trend(t, x, out, lambda1):
+    trend, time = trendfilter(t, x, lambda1)
+    return time, trend
+
+
+def _average(t, x, out, t_win):
+    return t, avgMovWin(t, x, t_win, out=out)
+
+
+def _rms(t, x, out, t_win):
+    return t, rmsMovWin(t, x, t_win, out=out)
+
+
+# Name of the operation: (function, {parameter: type}), the parameters being named as in 'functions'
+operations = {
+    'lowpass': (_lowpass, {'fc': float}),
+    'highpass': (_highpass, {'fc': float}),
+    'derivative': (_derivative, {'method': str}),
+    'integration': (_integration, {'method': str}),
+    'phasor_mag': (_phasor_mag, {'sr': int, 'cycles': float, 'dom_freq': int}),
+    'phasor_angle': (_phasor_angle, {'sr': int, 'cycles': float, 'dom_freq': int}),
+    'trend': (_trend, {'lambda1': float}),
+    'average': (_average, {'t_win': float}),
+    'rms': (_rms, {'t_win': float}),
+}
+
+
+class Step:
+    """
+    One operation of a pipeline with its parameters, e.g. Step('lowpass', fc=100).
+    """
+
+    def __init__(self, operation, **params):
+        if operation not in operations:
+            raise ValueError(f'Unknown operation \'{operation}\', expected one of {list(operations)}')
+        function, types = operations[operation]
+        for key in params:
+            if key not in types:
+                raise ValueError(f'Unknown parameter \'{key}\' of \'{operation}\', expected one of {list(types)}')
+
+        self.operation = operation
+        self.function = function
+        self.params = {key: types[key](value) for key, value in params.items()}
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Step from its text form 'operation:key=value,key=value', as given on the command line.
+        """
+        operation, _, arguments = text.partition(':')
+        params = dict(argument.partition('=')[::2] for argument in arguments.split(',') if argument)
+        return cls(operation, **params)
+
+    def key(self):
+        return self.operation, tuple(sorted(self.params.items()))
+
+    def __eq__(self, other):
+        return isinstance(other, Step) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f'{self.operation}({", ".join(f"{k}={v}" for k, v in self.params.items())})'
+
+    def apply(self, t, x, out=None):
+        return self.function(t, x, out, **self.params)
+
+
+class Pipeline:
+    """
+    Stack of steps applied one after the other to a signal.
+
+    With 'keep' (the default) the result of every step is kept, so that running the pipeline again on
+    the same signal only recomputes from the first step that changed. Without it, the intermediate
+    results are dropped as the pipeline goes and their buffers are reused as the output of the
+    following steps, so at most two signal buffers are held at any time.
+    """
+
+    def __init__(self, steps=()):
+        self.steps = list(steps)
+        self.computed = 0
+        self._results = []
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return ' -> '.join(map(repr, self.steps))
+
+    def clear(self):
+        # Drops the kept results
+        with self._lock:
+            self._results = []
+
+    def run(self, t, x, key=None, keep=True, steps=None):
+        """
+        Applies the steps to a signal.
+
+        :param t: Time array
+        :param x: Signal array, never written to
+        :param key: Hashable identifier of the signal, the kept results are only reused for the same key
+        :param keep: If True the results of the steps are kept for the next run
+        :param steps: Steps to apply instead of the current ones, e.g. a snapshot taken when the run was queued
+        :return: Time and signal arrays after the last step.
+        """
+        with self._lock:
+            steps = list(self.steps if steps is None else steps)
+            t = np.asarray(t, dtype=float)
+            x = np.asarray(x, dtype=float)
+            signal = x
+
+            # Longest run of leading steps already evaluated for this signal
+            reused = 0
+            if keep:
+                signature = (key,)
+                for step, (kept, _, _) in zip(steps, self._results):
+                    signature += (step.key(),)
+                    if key is None or kept != signature:
+                        break
+                    reused += 1
+                del self._results[reused:]
+                if reused:
+                    _, t, x = self._results[reused - 1]
+
+            self.computed = 0
+            signature = (key,) + tuple(step.key() for step in steps[:reused])
+            spare = None
+            for step in steps[reused:]:
+                out = spare if spare is not None and len(spare) == len(x) else None
+                t_new, y = step.apply(t, x, out)
+                self.computed += 1
+
+                if keep:
+                    # Kept results are handed out again by the following runs, so protected against in-place changes
+                    signature += (step.key(),)
+                    y.flags.writeable = False
+                    self._results.append((signature, t_new, y))
+                elif x is not signal and x is not y and x.dtype == np.float64 and x.flags.owndata and x.flags.writeable:
+                    # Intermediate result no longer needed, its buffer takes the output of a following step
+                    spare = x
+                else:
+                    spare = None
+                t, x = t_new, y
+            return t, x
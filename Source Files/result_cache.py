@@ -0,0 +1,215 @@
+import os
+import sys
+import hashlib
+import inspect
+import tempfile
+import weakref
+from functools import lru_cache
+import numpy as np
+from memory_cache import MemoryCache
+
+"""
+Memoization of the results of the functions applied to the signals. Results are keyed on a
+fingerprint of the input data and the parameters, so plotting an earlier result again does not
+recompute it, and optionally kept on disk so they survive a restart of the application.
+"""
+
+# Version of the cached results, part of every key. To be increased whenever a result changes in a way the keys
+# cannot see (a change in a module other than the one of the function), the results stored on disk are then ignored.
+RESULTS_VERSION = 1
+
+# Fingerprints of the read-only arrays (the columns loaded by 'data_loader'), {id: (weak reference, fingerprint)}
+_fingerprints = {}
+
+
+def _forget(ref, key):
+    # Helper function, drops the fingerprint of an array once it has been garbage collected
+    if _fingerprints.get(key, (None,))[0] is ref:
+        del _fingerprints[key]
+
+
+def fingerprint(a):
+    """
+    Hash of the content of an array. Read-only arrays cannot change, they are only hashed once.
+
+    :param a: Array
+    :return: Hexadecimal string.
+    """
+    a = np.asarray(a)
+    cached = _fingerprints.get(id(a))
+    if cached is not None and cached[0]() is a:
+        return cached[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{a.dtype.str}{a.shape}'.encode())
+    digest.update(np.ascontiguousarray(a).data)
+    value = digest.hexdigest()
+
+    if not a.flags.writeable:
+        ref = weakref.ref(a, lambda ref, key=id(a): _forget(ref, key))
+        _fingerprints[id(a)] = (ref, value)
+    return value
+
+
+@lru_cache(maxsize=None)
+def _module_hash(module):
+    # Helper function, hash of the source of a module, so that a change of any helper of a function changes its keys
+    try:
+        source = inspect.getsource(sys.modules[module])
+    except (KeyError, TypeError, OSError):
+        return ''
+    return hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+
+
+def _token(value):
+    # Helper function, text identifying an argument of a function, arrays by the fingerprint of their content
+    if isinstance(value, np.ndarray) or hasattr(value, 'to_numpy'):
+        return f'array:{fingerprint(value)}'
+    elif isinstance(value, (list, tuple)):
+        return f'{type(value).__name__}({",".join(_token(v) for v in value)})'
+    return repr(value)
+
+
+def _pack(result):
+    # Helper function, (kind, list of arrays) of a result, None if the result is not made of arrays only
+    if isinstance(result, np.ndarray):
+        return 'array', [result]
+    if isinstance(result, (list, tuple)) and all(isinstance(r, np.ndarray) for r in result):
+        return type(result).__name__, list(result)
+    return None
+
+
+def _unpack(kind, arrays):
+    # Helper function, inverse of '_pack'
+    if kind == 'array':
+        return arrays[0]
+    return tuple(arrays) if kind == 'tuple' else list(arrays)
+
+
+class ResultCache(MemoryCache):
+    """
+    Cache of function results, shared by every plot of the application.
+
+    Entries are keyed on the function, its code and its arguments, arrays being identified by
+    the fingerprint of their content. They are evicted least recently used first once the memory
+    budget is exceeded. With a 'directory', results are also written to disk and looked up there
+    after a restart, the least recently used files being removed beyond 'max_disk_bytes'.
+    """
+
+    def __init__(self, max_bytes=1024 ** 3, directory=None, max_disk_bytes=10 * 1024 ** 3):
+        super().__init__(max_bytes)
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_hits = 0
+
+    def key(self, function, args, kwargs):
+        """
+        :return: Key of the result of 'function(*args, **kwargs)', as a hexadecimal string.
+        """
+        # The code of the function, its constants and the source of its module are part of the key, results stored on
+        # disk by an older version of the module are not reused
+        code = getattr(function, '__code__', None)
+        code_hash = hashlib.blake2b(code.co_code + repr(code.co_consts).encode(), digest_size=8).hexdigest() if code else ''
+        parts = [str(RESULTS_VERSION), str(function.__module__), function.__qualname__, code_hash,
+                 _module_hash(function.__module__)]
+        parts += [_token(a) for a in args]
+        parts += [f'{k}={_token(v)}' for k, v in sorted(kwargs.items())]
+        return hashlib.blake2b('|'.join(parts).encode(), digest_size=20).hexdigest()
+
+    def __call__(self, function, *args, **kwargs):
+        """
+        Result of 'function(*args, **kwargs)', computed only if it is not cached yet.
+        Results made of arrays are cached, and shared between the callers so marked read-only.
+        """
+        key = self.key(function, args, kwargs)
+        with self._lock:
+            packed = self._lookup(key)
+        if packed is not None:
+            return _unpack(*packed)
+
+        packed = self._load(key)
+        if packed is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            result = function(*args, **kwargs)
+            packed = _pack(result)
+            if packed is None:
+                return result
+            self._save(key, packed)
+
+        # Read-only views, the arrays of the result may be inputs of the function the caller still writes to
+        packed = packed[0], [a.view() for a in packed[1]]
+        for a in packed[1]:
+            a.flags.writeable = False
+        self.put(key, packed)
+        return _unpack(*packed)
+
+    def stats(self):
+        """
+        :return: Dictionary with the hit/miss counts and the memory used by the cache.
+        """
+        stats = super().stats()
+        stats['disk_hits'] = self.disk_hits
+        return stats
+
+    def _size(self, packed):
+        # Memory used by the arrays of a result
+        return sum(a.nbytes for a in packed[1])
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def _load(self, key):
+        # Result stored on disk, None if there is none
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with np.load(self._path(key)) as npz:
+                kind = str(npz['kind'])
+                arrays = [npz[f'arr_{i}'] for i in range(len(npz.files) - 1)]
+            # Marks the file as recently used
+            os.utime(self._path(key))
+        except (OSError, ValueError, KeyError):
+            return None
+        return kind, arrays
+
+    def _save(self, key, packed):
+        # Written to a temporary file of its own first, a result is never read half written, even when several
+        # workers compute the same result at the same time
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, *packed[1], kind=np.array(packed[0]))
+            os.replace(temp, self._path(key))
+        except BaseException:
+            os.remove(temp)
+            raise
+
+        # Files removed meanwhile by another worker are skipped
+        stats = []
+        for f in os.listdir(self.directory):
+            if f.endswith('.npz'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, f))
+                except FileNotFoundError:
+                    continue
+                stats.append((stat.st_mtime_ns, stat.st_size, os.path.join(self.directory, f)))
+        total = sum(size for _, size, _ in stats)
+        for _, size, f in sorted(stats):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(f)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+# Cache of the results of the functions applied in the application, in memory only until a directory is set
+result_cache = ResultCache()
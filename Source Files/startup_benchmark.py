@@ -0,0 +1,71 @@
+import argparse
+import os
+import subprocess
+import sys
+
+"""
+Startup time benchmark of the application. Every module is imported in a fresh interpreter a few
+times, the best time is compared to the budget of the module. Also checks that the readers of the
+different file types are not imported at startup, they are only loaded on first use.
+
+    python startup_benchmark.py --repeat 5
+"""
+
+# Import time budgets in seconds (best of the repeats)
+budgets = {'functions': 0.5, 'data_loader': 1.0, 'conversion_functions': 1.0, 'PPT_cli': 1.0, 'PPT_V2': 2.5}
+
+# Modules loaded on first use only
+lazy_modules = ['comtrade', 'scipy.io', 'scipy.signal', 'scipy.linalg', 'scipy.sparse', 'h5py', 'statsmodels', 'PyQt6']
+
+_child = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(','.join(m for m in {lazy!r} if m in sys.modules))
+'''
+
+
+def measure(module, repeat):
+    # Best import time of 'module' over 'repeat' fresh interpreters, and the lazy modules it imported
+    best = None
+    loaded = []
+    for _ in range(repeat):
+        run = subprocess.run([sys.executable, '-c', _child.format(module=module, lazy=lazy_modules)],
+                             cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True)
+        if run.returncode != 0:
+            raise RuntimeError(run.stderr.strip().splitlines()[-1])
+        seconds, modules = run.stdout.splitlines()[-2:]
+        best = float(seconds) if best is None else min(best, float(seconds))
+        loaded = modules.split(',') if modules else []
+    return best, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measures the import time of the modules of the application.')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of fresh interpreters per module (default: 5)')
+    parser.add_argument('modules', nargs='*', default=list(budgets), help='Modules to measure (default: all)')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        try:
+            seconds, loaded = measure(module, args.repeat)
+        except RuntimeError as e:
+            print(f'{module:<22} could not be imported, {e}')
+            failed = True
+            continue
+
+        budget = budgets.get(module, float('inf'))
+        status = 'OK' if seconds <= budget and not loaded else 'FAILED'
+        failed |= status == 'FAILED'
+        message = f'{module:<22} {seconds:6.3f} s (budget {budget:.1f} s) {status}'
+        if loaded:
+            message += f', loaded at startup: {", ".join(loaded)}'
+        print(message)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+"""
+Background execution of the computations of the application, so the GUI thread only
+draws the results.
+"""
+
+
+class Cancelled(Exception):
+    # Raised inside a job once its worker has been cancelled
+    pass
+
+
+class WorkerSignals(QObject):
+    """
+    Signals of a 'Worker', delivered to the GUI thread.
+
+    progress: (percentage, message)
+    result: Return value of the job
+    error: Error message if the job raised
+    finished: Emitted last, whatever the outcome of the job
+    """
+    progress = pyqtSignal(int, str)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """
+    Runs 'fn(*args, progress=..., check=...)' on a thread of a QThreadPool.
+
+    'progress(percentage, message)' reports the progress of the job, 'check()' raises 'Cancelled'
+    once 'cancel' has been called, the job calls it between its stages. The result of a cancelled
+    job is never delivered.
+    """
+
+    def __init__(self, fn, *args):
+        QRunnable.__init__(self)
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+        self.signals = WorkerSignals()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, progress=self.signals.progress.emit, check=self.check)
+            self.check()
+        except Cancelled:
+            pass
+        except Exception as e:
+            self.signals.error.emit(f'{type(e).__name__}: {e}')
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()